@@ -48,6 +48,8 @@ class MetadataAgent(BaseAgent):
         ]
         self.retriever = retriever
         self.tool_names = [tool.name for tool in self.tools]
+        # The tool system prompt depends only on the tool list; build it once
+        self._tool_system_prompt = self._create_metadata_tool_system_prompt()
 
     def process(self, state: AgentState) -> AgentResult:
         """Process metadata queries to provide database structure information."""
@@ -59,8 +61,19 @@ class MetadataAgent(BaseAgent):
             if validation_error:
                 return validation_error
 
-            # Use tool-enabled LLM to intelligently retrieve schema information
-            response = self._process_query_with_tools(state.natural_language_query)
+            # Multi-line input (e.g. from the API) is treated as a batch
+            # of independent questions and answered in one tool-enabled
+            # call, amortizing the large tool system prompt
+            questions = [q.strip() for q in state.natural_language_query.splitlines() if q.strip()]
+            if len(questions) > 1:
+                answers = self.process_queries_batch(questions)
+                response = "\n\n".join(
+                    f"{i}. {question}\n{answer}"
+                    for i, (question, answer) in enumerate(zip(questions, answers), 1)
+                )
+            else:
+                # Use tool-enabled LLM to intelligently retrieve schema information
+                response = self._process_query_with_tools(state.natural_language_query)
 
             return self._create_success_result(response, state.natural_language_query)
 
@@ -143,7 +156,7 @@ class MetadataAgent(BaseAgent):
             Final LLM response as a string
         """
         try:
-            system_message = self._create_metadata_tool_system_prompt()
+            system_message = self._tool_system_prompt
 
             response = self.generate_with_llm(
                 system_message=system_message,
@@ -165,3 +178,50 @@ class MetadataAgent(BaseAgent):
         except Exception as e:
             logger.error(f"Error in metadata tool processing: {e}")
             return f"Unable to retrieve metadata at the moment. Error: {e}"
+
+    def process_queries_batch(self, queries: List[str]) -> List[str]:
+        """
+        Answer several independent metadata queries in one LLM invocation.
+
+        Packing the questions into a single call amortizes the large tool
+        system prompt across the batch instead of resending it per query.
+
+        Args:
+            queries: Metadata questions to answer together
+
+        Returns:
+            One response string per query, in input order
+        """
+        if not queries:
+            return []
+        if len(queries) == 1:
+            return [self._process_query_with_tools(queries[0])]
+
+        numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(queries, 1))
+        batch_prompt = (
+            f"Answer each of the following {len(queries)} independent metadata "
+            "questions. Start each answer on its own line with the marker "
+            "'### Answer N' (where N is the question number), in order.\n\n"
+            f"{numbered}"
+        )
+
+        response = self._process_query_with_tools(batch_prompt)
+
+        # Split on the answer markers; fall back to repeating the full
+        # response if the model did not follow the format
+        parts = response.split("### Answer ")
+        answers = {}
+        for part in parts[1:]:
+            number, _, body = part.partition("\n")
+            try:
+                answers[int(number.strip().rstrip('.:'))] = body.strip()
+            except ValueError:
+                continue
+
+        # Only trust the split when every expected number is present;
+        # counting alone passes on 0-based or duplicated numbering
+        if set(answers) == set(range(1, len(queries) + 1)):
+            return [answers[i] for i in range(1, len(queries) + 1)]
+
+        logger.warning("Batched metadata response missing markers; returning unsplit text")
+        return [response for _ in queries]
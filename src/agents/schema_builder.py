@@ -7,6 +7,7 @@ formatted schema context that can be used by other agents.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 
 from .base_agent import BaseAgent
@@ -73,13 +74,18 @@ class SchemaBuilderAgent(BaseAgent):
             }
         }
 
-        # Step 1: Retrieve database information
-        for db_name in databases:
-            db_info = self._get_database_info(db_name)
+        # Steps 1-2: per-database and per-table lookups are independent of
+        # each other, so fan them out instead of walking them sequentially
+        if len(databases) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(databases), 4)) as executor:
+                db_infos = list(executor.map(self._get_database_info, databases))
+        else:
+            db_infos = [self._get_database_info(db_name) for db_name in databases]
+
+        for db_name, db_info in zip(databases, db_infos):
             if db_info:
                 schema_context["databases"][db_name] = db_info
 
-        # Step 2: Retrieve table and column information
         table_details = self._get_table_details(tables, databases)
         schema_context["tables"] = table_details
 
@@ -141,35 +147,46 @@ class SchemaBuilderAgent(BaseAgent):
         Returns:
             Dictionary mapping table names to their complete details
         """
-        table_details = {}
-
-        for table in tables:
-            # Handle table name formats: "database.table" or just "table"
-            if "." in table:
-                db_name, table_name = table.split(".", 1)
-            else:
-                table_name = table
-                # Try to match with available databases
-                db_name = self._find_database_for_table(table_name, databases)
-
-            if not db_name:
-                logger.warning(f"⚠️ Could not determine database for table '{table_name}'")
-                continue
-
-            # Get table summary and columns from schemas
-            table_info = self._get_table_info(db_name, table_name)
-            column_info = self._get_column_info(db_name, table_name)
-
-            if table_info or column_info:
-                full_table_name = f"{db_name}.{table_name}"
-                table_details[full_table_name] = {
-                    "database": db_name,
-                    "table": table_name,
-                    "summary": table_info,
-                    "columns": column_info
-                }
+        # Each table's lookups are independent; resolve them concurrently
+        # while keeping the caller's ordering
+        if len(tables) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(tables), 4)) as executor:
+                resolved = list(executor.map(
+                    lambda table: self._resolve_table_details(table, databases), tables
+                ))
+        else:
+            resolved = [self._resolve_table_details(table, databases) for table in tables]
+
+        return {entry[0]: entry[1] for entry in resolved if entry}
+
+    def _resolve_table_details(self, table: str, databases: List[str]) -> Optional[tuple]:
+        """Resolve one table reference to its (full_name, details) entry."""
+        # Handle table name formats: "database.table" or just "table"
+        if "." in table:
+            db_name, table_name = table.split(".", 1)
+        else:
+            table_name = table
+            # Try to match with available databases
+            db_name = self._find_database_for_table(table_name, databases)
+
+        if not db_name:
+            logger.warning(f"⚠️ Could not determine database for table '{table_name}'")
+            return None
+
+        # Get table summary and columns from schemas
+        table_info = self._get_table_info(db_name, table_name)
+        column_info = self._get_column_info(db_name, table_name)
+
+        if table_info or column_info:
+            full_table_name = f"{db_name}.{table_name}"
+            return full_table_name, {
+                "database": db_name,
+                "table": table_name,
+                "summary": table_info,
+                "columns": column_info
+            }
 
-        return table_details
+        return None
 
     def _find_database_for_table(self, table_name: str, databases: List[str]) -> Optional[str]:
         """Find which database contains the specified table."""
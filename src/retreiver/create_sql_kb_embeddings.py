@@ -1,12 +1,18 @@
+import hashlib
 import os
+import queue
 import sys
+import threading
 import warnings
-import json
+import orjson
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any
 from datetime import datetime
 import argparse
 from tqdm import tqdm
+import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer
 import chromadb
@@ -19,14 +25,57 @@ from src.retriever.sql_kb_chunker import SQLKnowledgeBaseChunker
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 
+# Per-process chunker for the parsing pool; created lazily in each worker
+# so the instance never has to cross the process boundary
+_WORKER_CHUNKER = None
+
+
+def _parse_markdown_worker(path: str):
+    global _WORKER_CHUNKER
+    if _WORKER_CHUNKER is None:
+        _WORKER_CHUNKER = SQLKnowledgeBaseChunker()
+    return _WORKER_CHUNKER.parse_markdown_file(path)
+
+
+def _parse_markdown_worker_safe(path: str):
+    """Worker wrapper that returns the exception instead of raising, so a
+    bad file doesn't tear down the whole pool map."""
+    try:
+        return _parse_markdown_worker(path)
+    except Exception as e:
+        return e
+
+
+def _quantize_int8(embeddings: np.ndarray) -> np.ndarray:
+    """Quantize each embedding row independently to the int8 value range.
+
+    Per-row max-abs scaling is batch-independent: a vector maps to the
+    same quantized values whether encoded alone (query time) or inside a
+    bulk index batch, so stored and query vectors share one quantized
+    space. Scaling by a positive per-row factor preserves each vector's
+    direction, so under the collection's cosine space rankings only
+    shift by rounding error; the quantization is still lossy. Note that
+    ChromaDB stores vectors as float32 regardless, so this does not
+    shrink the index — it only coarsens the stored values.
+    """
+    scales = np.abs(embeddings).max(axis=1, keepdims=True)
+    np.maximum(scales, 1e-12, out=scales)  # all-zero rows divide safely
+    return np.rint(embeddings * (127.0 / scales))
+
+
 class BGE_M3_EmbeddingFunction(embedding_functions.EmbeddingFunction):
     """Custom embedding function for ChromaDB using BGE-M3"""
-    
-    def __init__(self, model):
+
+    def __init__(self, model, precision: str = "float32"):
         self.model = model
-    
+        # Queries must be quantized the same way as the stored vectors
+        self.precision = precision
+
     def __call__(self, input: List[str]) -> List[List[float]]:
-        embeddings = self.model.encode(input, show_progress_bar=False)
+        embeddings = self.model.encode(input, show_progress_bar=False,
+                                       convert_to_numpy=True)
+        if self.precision == "int8":
+            embeddings = _quantize_int8(embeddings)
         return embeddings.tolist()
 
 
@@ -36,7 +85,9 @@ class SQLKnowledgeBaseEmbedder:
     def __init__(self,
                  model_path: str = None,
                  chroma_persist_dir: str = "./src/kb",
-                 collection_name: str = "sql_generation_kb"):
+                 collection_name: str = "sql_generation_kb",
+                 backend: str = "torch",
+                 vector_precision: str = "float32"):
         """
         Initialize the embedder with BGE-M3 and ChromaDB
 
@@ -44,6 +95,14 @@ class SQLKnowledgeBaseEmbedder:
             model_path: Path to local BGE-M3 model
             chroma_persist_dir: Directory to persist ChromaDB
             collection_name: Name of the ChromaDB collection
+            backend: Inference backend for SentenceTransformer
+                ("torch" or "onnx"; onnx fuses ops and removes eager-mode
+                overhead for the frozen encoder)
+            vector_precision: Vector value precision ("float32" or
+                "int8"; int8 rounds each vector to 127 levels per
+                dimension — lossy but ranking-safe under the collection's
+                cosine space. ChromaDB stores float32 either way, so
+                index size is unchanged.)
         """
         # Set default model path
         if model_path is None:
@@ -52,15 +111,35 @@ class SQLKnowledgeBaseEmbedder:
         # Detect and set device for MPS optimization on M1 Macs
         self.device = 'mps' if torch.backends.mps.is_available() else 'cpu'
 
+        # Allow reduced-precision matmuls on accelerators: the encoder
+        # forward pass is compute-bound and BGE-M3 retrieval quality is
+        # insensitive to TF32/FP16 accumulation
+        if self.device != 'cpu':
+            torch.set_float32_matmul_precision('high')
+            if torch.cuda.is_available():
+                torch.backends.cuda.matmul.allow_tf32 = True
+                torch.backends.cudnn.allow_tf32 = True
+
         print(f"🚀 Using device: {self.device}")
         print(f"🚀 Loading BGE-M3 model")
 
+        # Fast tokenizers fork worker threads per encode call by default;
+        # keep tokenization single-threaded since we batch at the model level
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
         # Load model with device optimization
         if Path(model_path).exists():
-            self.model = SentenceTransformer(model_path, device=self.device)
+            self.model = SentenceTransformer(model_path, device=self.device, backend=backend)
             print("✅ Model loaded from local cache with MPS optimization" if self.device == 'mps' else "✅ Model loaded from local cache")
         else:
             raise FileNotFoundError(f"Model not found at {model_path}. Please ensure BGE-M3 is downloaded.")
+
+        # Warm-up forward pass: pays the lazy kernel/tokenizer init here
+        # instead of inside the first timed embedding batch
+        try:
+            self.model.encode(["warm up"], show_progress_bar=False)
+        except Exception:
+            pass
         
         # Initialize ChromaDB
         self.chroma_client = chromadb.PersistentClient(
@@ -70,10 +149,12 @@ class SQLKnowledgeBaseEmbedder:
         print(f"✅ ChromaDB initialized at: {chroma_persist_dir}")
         
         self.collection_name = collection_name
+        self.vector_precision = vector_precision
+        self.chroma_persist_dir = chroma_persist_dir
         self.chunker = SQLKnowledgeBaseChunker()
         
     def create_or_get_collection(self, reset: bool = False):
-        embedding_function = BGE_M3_EmbeddingFunction(self.model)
+        embedding_function = BGE_M3_EmbeddingFunction(self.model, precision=self.vector_precision)
         
         if reset:
             # Delete existing collection if reset
@@ -89,9 +170,6 @@ class SQLKnowledgeBaseEmbedder:
                 embedding_function=embedding_function
             )
             print(f"✅ Using existing collection: {self.collection_name}")
-            # Get count of existing documents
-            count = collection.count()
-            print(f"📊 Existing documents in collection: {count}")
         except:
             # Create new collection
             collection = self.chroma_client.create_collection(
@@ -101,36 +179,43 @@ class SQLKnowledgeBaseEmbedder:
                     "description": "SQL Generation Knowledge Base with BGE-M3 embeddings",
                     "created_at": datetime.now().isoformat(),
                     "embedding_model": "BAAI/bge-m3",
-                    "chunk_strategy": "contextual_v2"
+                    "chunk_strategy": "contextual_v2",
+                    # BGE-M3 vectors are unit-normalized, so cosine ranks
+                    # the same as L2 for float32 — and unlike L2 it is
+                    # invariant to the per-row int8 scaling factors
+                    "hnsw:space": "cosine"
                 }
             )
             print(f"✅ Created new collection: {self.collection_name}")
         
         return collection
     
-    def process_markdown_files(self, md_directory: str, batch_size: int = 5):
+    def process_markdown_files(self, md_directory: str, batch_size: int = 5, workers: int = 1):
         """Process all markdown files in the directory"""
         md_path = Path(md_directory)
         if not md_path.exists():
             raise FileNotFoundError(f"Directory not found: {md_directory}")
-        
+
         # Get all markdown files
         md_files = list(md_path.glob("*.md"))
         print(f"\n📁 Found {len(md_files)} markdown files to process")
-        
+
         all_chunks = []
         parsing_errors = []
-        
-        # Process each file
+
+        # Process each file; parsing is pure-Python CPU work, so fan it
+        # out across processes when more than one worker is requested
         print("\n🔍 Chunking markdown files...")
-        for md_file in tqdm(md_files, desc="Processing files"):
-            try:
-                chunks = self.chunker.parse_markdown_file(str(md_file))
-                all_chunks.extend(chunks)
-            except Exception as e:
-                error_msg = f"Error processing {md_file.name}: {str(e)}"
+        for md_file, result in tqdm(
+            zip(md_files, self._parse_files(md_files, workers)),
+            desc="Processing files", total=len(md_files), mininterval=0.5
+        ):
+            if isinstance(result, Exception):
+                error_msg = f"Error processing {md_file.name}: {str(result)}"
                 parsing_errors.append(error_msg)
                 print(f"\n❌ {error_msg}")
+            else:
+                all_chunks.extend(result)
         
         print(f"\n✅ Created {len(all_chunks)} chunks from {len(md_files)} files")
 
@@ -145,31 +230,78 @@ class SQLKnowledgeBaseEmbedder:
         
         return all_chunks, parsing_errors
     
+    def _parse_files(self, md_files: List[Path], workers: int = 1):
+        """Yield per-file parse results (chunk lists, or the Exception raised).
+
+        With workers > 1 the files are parsed in a process pool; results
+        keep file order either way so callers can zip them with md_files.
+        """
+        if workers > 1 and len(md_files) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                yield from executor.map(
+                    _parse_markdown_worker_safe, (str(f) for f in md_files)
+                )
+            return
+
+        for md_file in md_files:
+            try:
+                yield self.chunker.parse_markdown_file(str(md_file))
+            except Exception as e:
+                yield e
+
     def _print_chunk_statistics(self, chunks: List):
-        db_chunks = [c for c in chunks if c.chunk_type == 'database']
-        table_chunks = [c for c in chunks if c.chunk_type == 'table']
-        column_chunks = [c for c in chunks if c.chunk_type == 'column']
-        
+        # One pass over the chunks: count types and collect names together
+        type_counts = Counter()
         unique_dbs = set()
         unique_modules = set()
         for chunk in chunks:
-            if 'database_name' in chunk.metadata:
-                unique_dbs.add(chunk.metadata['database_name'])
-            if 'module_name' in chunk.metadata:
-                unique_modules.add(chunk.metadata['module_name'])
-        
+            type_counts[chunk.chunk_type] += 1
+            db_name = chunk.metadata.get('database_name')
+            if db_name is not None:
+                unique_dbs.add(db_name)
+            module_name = chunk.metadata.get('module_name')
+            if module_name is not None:
+                unique_modules.add(module_name)
+
         print("\n📊 Chunk Statistics:")
         print(f"   - Total chunks: {len(chunks)}")
-        print(f"   - Database info chunks: {len(db_chunks)}")
-        print(f"   - Table summary chunks: {len(table_chunks)}")
-        print(f"   - Table columns chunks: {len(column_chunks)}")
+        print(f"   - Database info chunks: {type_counts['database']}")
+        print(f"   - Table summary chunks: {type_counts['table']}")
+        print(f"   - Table columns chunks: {type_counts['column']}")
         print(f"   - Unique databases: {len(unique_dbs)}")
         print(f"   - Unique modules: {len(unique_modules)}")
     
-    def embed_chunks(self, chunks: List, collection, batch_size: int = 5):
-        """Embed chunks and store in ChromaDB with memory-aware batching"""
+    def _encode_documents(self, documents: List[str]) -> List[List[float]]:
+        """Encode documents with the model's own batching, applying the
+        configured vector precision."""
+        embeddings = self.model.encode(
+            documents,
+            batch_size=64,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        if self.vector_precision == "int8":
+            embeddings = _quantize_int8(embeddings)
+        return embeddings.tolist()
+
+    def embed_chunks(self, chunks: List, collection, batch_size: int = 5,
+                     embedding_cache: Dict[bytes, List[float]] = None):
+        """Embed chunks and store in ChromaDB with memory-aware batching.
+
+        embedding_cache maps a content digest to its embedding; when
+        provided, chunks repeating already-encoded content reuse the
+        cached vector instead of re-running the model, but every chunk is
+        still upserted under its own id and metadata so per-database
+        lookups keep working for each copy.
+        """
         print(f"\n🚀 Creating embeddings for {len(chunks)} chunks...")
 
+        # Group similar-length content into the same encode batch: padding
+        # to the longest item in a batch is wasted compute, so sorting by
+        # length minimizes it. Insertion order in the collection is
+        # irrelevant for retrieval.
+        chunks = sorted(chunks, key=lambda c: len(c.content))
+
         # Adaptive batch sizing based on content size
         if batch_size > 1:
             # Calculate average chunk size
@@ -188,7 +320,23 @@ class SQLKnowledgeBaseEmbedder:
 
         total_batches = (len(chunks) + adaptive_batch_size - 1) // adaptive_batch_size
 
-        for i in tqdm(range(0, len(chunks), adaptive_batch_size), desc="Embedding batches", total=total_batches):
+        # Producer/consumer split: this loop encodes, a writer thread
+        # inserts, so the encoder never idles waiting on SQLite/HNSW.
+        # The bounded queue caps how many encoded batches sit in memory.
+        write_queue = queue.Queue(maxsize=4)
+        write_errors: List[Exception] = []
+        writer = threading.Thread(
+            target=self._collection_writer,
+            args=(collection, write_queue, write_errors), daemon=True
+        )
+        writer.start()
+
+        # Coarse progress refresh: with thousands of tiny batches, per-
+        # iteration terminal redraws are measurable overhead
+        for i in tqdm(range(0, len(chunks), adaptive_batch_size), desc="Embedding batches",
+                      total=total_batches, miniters=10, mininterval=0.5):
+            if write_errors:
+                break  # no point encoding more once the writer has failed
             batch = chunks[i:i + adaptive_batch_size]
 
             # Remove within-batch dup ids
@@ -203,62 +351,98 @@ class SQLKnowledgeBaseEmbedder:
             if not batch:
                 continue
 
-            # Skip IDs that already exist in the collection
-            ids = [c.chunk_id for c in batch]
-            try:
-                existing = collection.get(ids=ids)
-                existing_ids = set(existing.get('ids', [])) if existing and existing.get('ids') else set()
-            except Exception:
-                existing_ids = set()
-
-            batch = [c for c in batch if c.chunk_id not in existing_ids]
-            if not batch:
-                continue
-
             documents = [c.content for c in batch]
 
-            processed_metadatas = []
-            for c in batch:
-                m = {}
-                for k, v in c.metadata.items():
-                    if isinstance(v, list):
-                        m[k] = ','.join(str(x) for x in v)
+            # Encode explicitly with the model's own batching instead of
+            # routing through ChromaDB's embedding_function, which would
+            # re-launch the encoder per tiny adaptive batch
+            if embedding_cache is None:
+                embeddings = self._encode_documents(documents)
+            else:
+                embeddings = [None] * len(documents)
+                to_encode: Dict[bytes, List[int]] = {}
+                for idx, doc in enumerate(documents):
+                    digest = hashlib.blake2b(doc.encode(), digest_size=16).digest()
+                    cached = embedding_cache.get(digest)
+                    if cached is not None:
+                        embeddings[idx] = cached
                     else:
-                        m[k] = v
-                        
-                m['chunk_type'] = c.chunk_type
-                processed_metadatas.append(m)
+                        to_encode.setdefault(digest, []).append(idx)
+                if to_encode:
+                    encoded = self._encode_documents(
+                        [documents[indices[0]] for indices in to_encode.values()]
+                    )
+                    for (digest, indices), embedding in zip(to_encode.items(), encoded):
+                        embedding_cache[digest] = embedding
+                        for idx in indices:
+                            embeddings[idx] = embedding
+
+            # Flatten list values in one comprehension; interning the keys
+            # collapses the millions of repeated 'database_name' etc.
+            # strings to shared objects across all metadata dicts
+            processed_metadatas = [
+                {
+                    **{
+                        sys.intern(k): ','.join(map(str, v)) if isinstance(v, list) else v
+                        for k, v in c.metadata.items()
+                    },
+                    'chunk_type': c.chunk_type,
+                }
+                for c in batch
+            ]
 
             ids = [c.chunk_id for c in batch]
 
+            # Hand the encoded batch to the writer thread so the next
+            # encode overlaps with the ChromaDB insert
+            batch_num = i // adaptive_batch_size + 1
+            write_queue.put((batch, documents, embeddings, processed_metadatas, ids, batch_num))
+
+        write_queue.put(None)
+        writer.join()
+
+        # Surface the writer failure so callers never treat the run (or
+        # its manifest bookkeeping) as successful
+        if write_errors:
+            raise write_errors[0]
+
+        print(f"\n✅ Successfully embedded chunks into collection '{self.collection_name}'")
+
+    def _collection_writer(self, collection, write_queue, errors):
+        """Consume encoded batches from the queue and insert them.
+
+        Runs on a worker thread so encoding (compute-bound) and ChromaDB
+        writes (I/O-bound) proceed concurrently. A None item terminates.
+        The first write failure is appended to errors; later items are
+        drained without writing so the producer never blocks on put."""
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            if errors:
+                continue
+            batch, documents, embeddings, processed_metadatas, ids, batch_num = item
             try:
-                collection.add(documents=documents, metadatas=processed_metadatas, ids=ids)
+                self._write_batch(collection, batch, documents, embeddings,
+                                  processed_metadatas, ids, batch_num)
             except Exception as e:
-                batch_num = i//adaptive_batch_size + 1
-                print(f"\n❌ Error embedding batch {batch_num}: {str(e)}")
-                print(f"   📋 Batch contains {len(batch)} chunks:")
-                for c in batch[:5]:  # Show first 5 chunks
-                    print(f"     - {c.chunk_id} (content size: {len(c.content)} chars)")
-                if len(batch) > 5:
-                    print(f"     ... and {len(batch) - 5} more chunks")
-
-                # Best-effort: try to add one-by-one skipping conflicts
-                failed_count = 0
-                for idx, c in enumerate(batch):
-                    try:
-                        # Use the corresponding metadata from the same index
-                        collection.add(documents=[c.content],
-                                       metadatas=[processed_metadatas[idx]],
-                                       ids=[c.chunk_id])
-                    except Exception as inner_e:
-                        failed_count += 1
-                        if failed_count <= 3:  # Only print first few errors
-                            print(f"   ❌ Failed to add chunk {c.chunk_id}: {str(inner_e)}")
-                        continue
-                if failed_count > 0:
-                    print(f"   ⚠️  Failed to add {failed_count} chunks from batch {batch_num}")
+                errors.append(e)
 
-        print(f"\n✅ Successfully embedded chunks into collection '{self.collection_name}'")
+    def _write_batch(self, collection, batch, documents, embeddings,
+                     processed_metadatas, ids, batch_num):
+        # upsert is idempotent on IDs, so re-runs replace in place and no
+        # existence query or ID-conflict retry loop is needed
+        try:
+            collection.upsert(documents=documents, embeddings=embeddings,
+                              metadatas=processed_metadatas, ids=ids)
+        except Exception as e:
+            print(f"\n❌ Error embedding batch {batch_num}: {str(e)}")
+            print(f"   📋 Batch contains {len(batch)} chunks:")
+            for c in batch[:5]:  # Show first 5 chunks
+                print(f"     - {c.chunk_id} (content size: {len(c.content)} chars)")
+            if len(batch) > 5:
+                print(f"     ... and {len(batch) - 5} more chunks")
+            raise
     
     def verify_embeddings(self, collection, sample_queries: List[str] = None):
         """Verify embeddings with sample queries"""
@@ -302,29 +486,27 @@ class SQLKnowledgeBaseEmbedder:
             except Exception as e:
                 print(f"   Error: {str(e)}")
     
-    def save_metadata(self, chunks: List, output_file: str = "src/retriever/output/sql_kb_metadata.json"):
-        """Save metadata about the knowledge base"""
-        metadata = {
-            "created_at": datetime.now().isoformat(),
-            "total_chunks": len(chunks),
-            "chunk_types": {
-                "database": len([c for c in chunks if c.chunk_type == 'database']),
-                "table": len([c for c in chunks if c.chunk_type == 'table']),
-                "column": len([c for c in chunks if c.chunk_type == 'column'])
-            },
-            "databases": list(set(c.metadata.get('database_name', 'unknown') for c in chunks)),
-            "modules": list(set(c.metadata.get('module_name', 'unknown') for c in chunks if 'module_name' in c.metadata)),
-            "collection_name": self.collection_name,
-            "embedding_model": "BAAI/bge-m3",
-            "chunk_strategy": "contextual_v2"
-        }
-        
-        with open(output_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        print(f"\n📄 Saved knowledge base metadata to {output_file}")
+    @property
+    def _manifest_path(self) -> Path:
+        return Path(self.chroma_persist_dir) / "manifest.json"
+
+    def _load_manifest(self) -> Dict[str, int]:
+        """Load the file-mtime manifest from the chroma directory."""
+        try:
+            with open(self._manifest_path, 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, int]):
+        try:
+            self._manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._manifest_path, 'wb') as f:
+                f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        except OSError as e:
+            print(f"⚠️  Could not persist manifest: {e}")
 
-    def save_metadata_from_stats(self, stats: Dict[str, Any], output_file: str = "src/retriever/output/sql_kb_metadata.json"):
+    def save_metadata(self, stats: Dict[str, Any], output_file: str = "src/retriever/output/sql_kb_metadata.json"):
         """Save metadata using pre-aggregated stats to avoid holding all chunks in memory"""
         metadata = {
             "created_at": datetime.now().isoformat(),
@@ -341,13 +523,16 @@ class SQLKnowledgeBaseEmbedder:
             "chunk_strategy": "contextual_v2"
         }
 
-        with open(output_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        # orjson serializes to bytes directly; write them without a text-
+        # mode encode pass
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
 
         print(f"\n📄 Saved knowledge base metadata to {output_file}")
 
     def embed_markdown_directory_streaming(self, md_directory: str, collection, batch_size: int = 5, test_only: bool = False,
-                                           per_file_output_dir: str = None, per_file_chunked_json_dir: str = None):
+                                           per_file_output_dir: str = None, per_file_chunked_json_dir: str = None,
+                                           workers: int = 1, reset: bool = False):
         """Stream-process markdown files: chunk, embed, and discard per file to minimize memory.
 
         Returns a tuple of (stats, parsing_errors).
@@ -361,6 +546,22 @@ class SQLKnowledgeBaseEmbedder:
         if test_only:
             md_files = md_files[:3]
 
+        # Incremental runs: skip files whose mtime matches the manifest
+        # from the previous run; only changed or new markdown is
+        # re-chunked and re-embedded. --reset ignores the manifest.
+        manifest = {} if reset else self._load_manifest()
+        unchanged = 0
+        remaining = []
+        for md_file in md_files:
+            mtime_ns = md_file.stat().st_mtime_ns
+            if manifest.get(str(md_file)) == mtime_ns:
+                unchanged += 1
+            else:
+                remaining.append(md_file)
+        if unchanged:
+            print(f"⏭️  Skipping {unchanged} unchanged files (manifest match)")
+        md_files = remaining
+
         print(f"\n📁 Found {len(md_files)} markdown files to process (streaming mode)")
 
         # Prepare optional output directories for per-file JSON dumps
@@ -379,10 +580,34 @@ class SQLKnowledgeBaseEmbedder:
         }
         parsing_errors: List[str] = []
 
-        for md_file in tqdm(md_files, desc="Streaming files"):
+        # Buffer chunks across files so the encoder sees full batches even
+        # when individual markdown files are small; flush at ~10x the
+        # embedding batch size to bound memory
+        pending_chunks: List = []
+        flush_threshold = max(batch_size * 10, batch_size)
+
+        # Files whose chunks sit in the buffer; their manifest entries
+        # are recorded only once the flush that writes those chunks
+        # succeeds, so a failed write can't mark them as processed
+        pending_files: List[tuple] = []
+
+        # Content-digest → embedding cache shared across the whole run;
+        # shared boilerplate content repeated across markdown files is
+        # encoded once, but every chunk still gets its own collection row
+        # (table/column content omits the database name, so dropping
+        # duplicates would lose all but the first database's metadata)
+        embedding_cache: Dict[bytes, List[float]] = {}
+
+        for md_file, parsed in tqdm(
+            zip(md_files, self._parse_files(md_files, workers)),
+            desc="Streaming files", total=len(md_files), mininterval=0.5
+        ):
             try:
-                chunks = self.chunker.parse_markdown_file(str(md_file))
+                if isinstance(parsed, Exception):
+                    raise parsed
+                chunks = parsed
                 if not chunks:
+                    manifest[str(md_file)] = md_file.stat().st_mtime_ns
                     continue
 
                 # Update stats before embedding
@@ -397,24 +622,50 @@ class SQLKnowledgeBaseEmbedder:
                     if module_name:
                         stats["modules"].add(module_name)
 
-                # Save per-file chunks JSON to requested folders (reuse chunker's utility)
+                # Save per-file chunks JSON to requested folders (reuse
+                # chunker's utility); when both directories resolve to the
+                # same place — the CLI defaults do — write the file once
                 base_name = md_file.stem
                 if per_file_output_dir:
                     out_path = Path(per_file_output_dir) / f"{base_name}_chunks_v2.json"
                     self.chunker.save_chunks_to_json(chunks, str(out_path))
-                if per_file_chunked_json_dir:
+                if per_file_chunked_json_dir and (
+                    not per_file_output_dir
+                    or Path(per_file_chunked_json_dir).resolve() != Path(per_file_output_dir).resolve()
+                ):
                     out_path2 = Path(per_file_chunked_json_dir) / f"{base_name}_chunks_v2.json"
                     self.chunker.save_chunks_to_json(chunks, str(out_path2))
 
-                # Embed and free per file
-                self.embed_chunks(chunks, collection, batch_size=batch_size)
-
-                # Explicitly drop reference to chunks to free memory earlier
+                # Accumulate and embed once the buffer is full
+                pending_chunks.extend(chunks)
+                pending_files.append((str(md_file), md_file.stat().st_mtime_ns))
                 del chunks
             except Exception as e:
                 error_msg = f"Error processing {md_file.name}: {str(e)}"
                 parsing_errors.append(error_msg)
                 print(f"\n❌ {error_msg}")
+                continue
+
+            # Flush outside the per-file error handler: a failed ChromaDB
+            # write raises out of the run before its files reach the
+            # manifest, so the next incremental run retries them
+            if len(pending_chunks) >= flush_threshold:
+                self.embed_chunks(pending_chunks, collection, batch_size=batch_size,
+                                  embedding_cache=embedding_cache)
+                pending_chunks = []
+                for path_str, mtime_ns in pending_files:
+                    manifest[path_str] = mtime_ns
+                pending_files = []
+
+        # Flush whatever remains after the last file
+        if pending_chunks:
+            self.embed_chunks(pending_chunks, collection, batch_size=batch_size,
+                              embedding_cache=embedding_cache)
+            pending_chunks = []
+        for path_str, mtime_ns in pending_files:
+            manifest[path_str] = mtime_ns
+
+        self._save_manifest(manifest)
 
         # Print brief statistics summary
         print("\n📊 Chunk Statistics (streaming):")
@@ -460,6 +711,15 @@ def main():
                        help="Directory for ChromaDB persistence")
     parser.add_argument("--collection-name", type=str, default="sql_generation_kb",
                        help="Name of ChromaDB collection")
+    parser.add_argument("--backend", type=str, default="torch", choices=["torch", "onnx"],
+                       help="SentenceTransformer inference backend (onnx requires the onnx extra)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Worker processes for markdown parsing (default: 1, serial)")
+    parser.add_argument("--vector-precision", type=str, default="float32",
+                       choices=["float32", "int8"],
+                       help="Stored vector value precision (int8 is lossy; ChromaDB stores "
+                            "float32 either way, so index size is unchanged — rebuild with "
+                            "--reset when changing)")
     parser.add_argument("--batch-size", type=int, default=3,
                        help="Batch size for embedding (default: 3, use 1 for max memory safety)")
     parser.add_argument("--single-chunk", action="store_true",
@@ -494,7 +754,9 @@ def main():
     embedder = SQLKnowledgeBaseEmbedder(
         model_path=args.model_path,
         chroma_persist_dir=args.chroma_dir,
-        collection_name=args.collection_name
+        collection_name=args.collection_name,
+        backend=args.backend,
+        vector_precision=args.vector_precision
     )
     
     # Create or get collection
@@ -508,6 +770,8 @@ def main():
         test_only=args.test_only,
         per_file_output_dir=args.output_dir,
         per_file_chunked_json_dir=args.chunked_json_dir,
+        workers=args.workers,
+        reset=args.reset,
     )
 
     if stats.get("total_chunks", 0) == 0:
@@ -515,7 +779,7 @@ def main():
         return
 
     # Save metadata using aggregated stats
-    embedder.save_metadata_from_stats(stats)
+    embedder.save_metadata(stats)
     
     # Verify embeddings
     embedder.verify_embeddings(collection)
@@ -3,12 +3,16 @@ SQL Generation Knowledge Base Chunker
 Streamlined version with minimal redundancy and focused content
 """
 
+import mmap
 import os
 import re
 import json
 import sys
+
+import orjson
 from typing import List, Dict, Any, Tuple, Optional, Union, Literal
 from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 import logging
 import argparse
 
@@ -16,6 +20,31 @@ import argparse
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import; parsing runs them per file/section so
+# recompiling (or re-hashing into re's internal cache) on every call adds up
+_WORKBOOK_RE = re.compile(r'# Workbook: (.+?)\.xlsx')
+_SHEET_RE = re.compile(r'## Sheet: (.+?)(?:\n|$)')
+# All database-info fields share one '- Label:: value' shape, so a single
+# alternation scans the section once instead of once per field
+_DB_INFO_FIELDS_RE = re.compile(
+    r'- (System Name|Module Name|Db Name|Purpose|Status):: (.+?)(?:\n|$)',
+    re.IGNORECASE
+)
+_DB_INFO_FIELD_COUNT = 5
+_TABLE_SECTION_SPLIT_RE = re.compile(r'(?=^### )', re.MULTILINE)
+# Matched with .match() on sections already anchored at '### ', so no '^'
+# prefix is needed and no start-position scan happens on non-table sections
+_TABLE_PATTERN_RE = re.compile(
+    r'### ([^\n]+)\s*\n'
+    r'\s*\|\s*Attribute\s*\|\s*Value\s*\|\s*\n'
+    r'\s*\|\s*[-]+\s*\|\s*[-]+\s*\|\s*\n'
+    r'\s*\|\s*Table Name\s*\|\s*([^\|]+)\s*\|\s*\n'
+    r'\s*\|\s*Purpose\s*\|\s*([^\|]+)\s*\|\s*\n'
+    r'\s*#### Columns\s*\n'
+    r'(.*)',
+    re.DOTALL
+)
+
 
 @dataclass
 class DatabaseChunk:
@@ -26,9 +55,11 @@ class DatabaseChunk:
     metadata: Dict[str, Any]
 
     def to_dict(self):
-        metadata = dict(self.metadata)
+        # The chunk constructors always set 'chunk_type'; only copy the
+        # metadata in the defensive case where it is missing
+        metadata = self.metadata
         if 'chunk_type' not in metadata:
-            metadata['chunk_type'] = self.chunk_type
+            metadata = {**metadata, 'chunk_type': self.chunk_type}
         return {
             'chunk_id': self.chunk_id,
             'content': self.content,
@@ -45,9 +76,9 @@ class TableChunk:
     metadata: Dict[str, Any]
 
     def to_dict(self):
-        metadata = dict(self.metadata)
+        metadata = self.metadata
         if 'chunk_type' not in metadata:
-            metadata['chunk_type'] = self.chunk_type
+            metadata = {**metadata, 'chunk_type': self.chunk_type}
         return {
             'chunk_id': self.chunk_id,
             'content': self.content,
@@ -64,10 +95,9 @@ class ColumnChunk:
     metadata: Dict[str, Any]
 
     def to_dict(self):
-        # Ensure chunk_type is in metadata
-        metadata = dict(self.metadata)
+        metadata = self.metadata
         if 'chunk_type' not in metadata:
-            metadata['chunk_type'] = self.chunk_type
+            metadata = {**metadata, 'chunk_type': self.chunk_type}
         return {
             'chunk_id': self.chunk_id,
             'content': self.content,
@@ -93,22 +123,33 @@ class SQLKnowledgeBaseChunker:
         logger.info(f"Parsing file: {file_path}")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Map the file and decode it in one shot rather than going
+            # through the text-mode incremental decoder
+            with open(file_path, 'rb') as f:
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        content = mm.read().decode('utf-8')
+                except ValueError:  # zero-length files cannot be mapped
+                    content = ''
             
             # Extract basic info
             workbook, sheet = self._extract_file_info(content)
-            
+
+            # Split the document into '### ' sections once; database info and
+            # table parsing both index into this instead of rescanning the
+            # full content with DOTALL patterns
+            sections = self._split_sections(content)
+
             # Parse database info
-            db_info = self._parse_database_info(content)
+            db_info = self._parse_database_info(sections)
             if not db_info:
                 self.parsing_errors.append(f"Failed to parse database info from {file_path}")
                 return []
-            
+
             chunks = []
 
             # Parse tables first to include in database chunk
-            tables = self._parse_tables(content)
+            tables = self._parse_tables(sections)
 
             # Add database info chunk
             db_chunk = self._create_database_chunk(db_info, tables)
@@ -138,38 +179,49 @@ class SQLKnowledgeBaseChunker:
     
     def _extract_file_info(self, content: str) -> Tuple[str, str]:
         """Extract workbook and sheet information"""
-        workbook_match = re.search(r'# Workbook: (.+?)\.xlsx', content)
-        sheet_match = re.search(r'## Sheet: (.+?)(?:\n|$)', content)
+        workbook_match = _WORKBOOK_RE.search(content)
+        sheet_match = _SHEET_RE.search(content)
         
         workbook = workbook_match.group(1) if workbook_match else "Unknown"
         sheet = sheet_match.group(1) if sheet_match else "Unknown"
         
         return workbook, sheet
     
-    def _parse_database_info(self, content: str) -> Optional[Dict[str, Any]]:
+    def _split_sections(self, content: str) -> List[Tuple[str, str]]:
+        """Split content once on '### ' headers into (title, section) pairs.
+
+        The full section text (header line included) is kept so the per-section
+        table pattern sees the same input as before.
+        """
+        sections = []
+        for section in _TABLE_SECTION_SPLIT_RE.split(content):
+            section = section.strip()
+            if not section.startswith('### '):
+                continue
+            title = section[4:].split('\n', 1)[0].strip()
+            sections.append((title, section))
+        return sections
+
+    def _parse_database_info(self, sections: List[Tuple[str, str]]) -> Optional[Dict[str, Any]]:
         """Parse database information section"""
-        db_info_pattern = r'### Database Info\n(.*?)(?=###|\Z)'
-        db_info_match = re.search(db_info_pattern, content, re.DOTALL)
-        
-        if not db_info_match:
+        db_info_text = None
+        for title, section in sections:
+            if title == 'Database Info':
+                # Field patterns only match '- Key:: value' lines, so the
+                # header line can stay in the searched text
+                db_info_text = section
+                break
+
+        if db_info_text is None:
             return None
-        
-        db_info_text = db_info_match.group(1)
-        
-        # Extract fields using regex
-        fields = {
-            'system_name': r'- System Name:: (.+?)(?:\n|$)',
-            'module_name': r'- Module Name:: (.+?)(?:\n|$)',
-            'db_name': r'- Db Name:: (.+?)(?:\n|$)',
-            'purpose': r'- Purpose:: (.+?)(?:\n|$)',
-            'status': r'- Status:: (.+?)(?:\n|$)'
-        }
-        
+
         db_info = {}
-        for key, pattern in fields.items():
-            match = re.search(pattern, db_info_text, re.IGNORECASE)
-            if match:
-                db_info[key] = match.group(1).strip()
+        for match in _DB_INFO_FIELDS_RE.finditer(db_info_text):
+            key = match.group(1).lower().replace(' ', '_')
+            # First occurrence wins, matching the old per-field search
+            db_info.setdefault(key, match.group(2).strip())
+            if len(db_info) == _DB_INFO_FIELD_COUNT:
+                break
         
         # Ensure we have at least db_name
         if 'db_name' not in db_info:
@@ -177,30 +229,12 @@ class SQLKnowledgeBaseChunker:
             
         return db_info
     
-    def _parse_tables(self, content: str) -> List[Dict[str, Any]]:
-        """Parse all tables from the markdown content"""
+    def _parse_tables(self, sections: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Parse all tables from the pre-split markdown sections"""
         tables = []
 
-        # Split content by table headers
-        sections = re.split(r'(?=^### )', content, flags=re.MULTILINE)
-
-        for section in sections:
-            section = section.strip()
-            if not section.startswith('### '):
-                continue
-
-            # Pattern to match individual table sections
-            table_pattern = (
-                r'^### ([^\n]+)\s*\n'
-                r'\s*\|\s*Attribute\s*\|\s*Value\s*\|\s*\n'
-                r'\s*\|\s*[-]+\s*\|\s*[-]+\s*\|\s*\n'
-                r'\s*\|\s*Table Name\s*\|\s*([^\|]+)\s*\|\s*\n'
-                r'\s*\|\s*Purpose\s*\|\s*([^\|]+)\s*\|\s*\n'
-                r'\s*#### Columns\s*\n'
-                r'(.*)'
-            )
-
-            match = re.search(table_pattern, section, re.DOTALL)
+        for title, section in sections:
+            match = _TABLE_PATTERN_RE.match(section)
             if match:
                 table_section_name = match.group(1).strip()
                 table_name = match.group(2).strip()
@@ -227,56 +261,66 @@ class SQLKnowledgeBaseChunker:
     def _parse_columns(self, columns_text: str) -> List[Dict[str, str]]:
         """Parse column information from column table"""
         columns = []
-        
-        # Pattern to match column rows - updated to capture all 6 fields
-        column_pattern = r'\| ([^\|]+) \| ([^\|]+) \| ([^\|]*) \| ([^\|]*) \| ([^\|]*) \| ([^\|]*) \|'
-        
-        for match in re.finditer(column_pattern, columns_text):
-            col_name = match.group(1).strip()
-            data_type = match.group(2).strip()
-            key = match.group(3).strip()
-            null = match.group(4).strip()
-            description = match.group(5).strip()
-            category = match.group(6).strip()
-            
+
+        for line in columns_text.split('\n'):
+            line = line.strip()
+            if not line.startswith('|'):
+                continue
+
+            # '| name | type | key | null | desc | category |' splits into a
+            # leading and trailing empty piece around the 6 fields
+            parts = line.split('|')
+            if len(parts) < 8:
+                continue
+
+            col_name = parts[1].strip()
+
             # Skip header row and separator lines
-            if col_name in ('Column', '---') or col_name.strip().replace('-', '').replace(' ', '') == '':
+            if col_name in ('Column', '---') or col_name.replace('-', '').replace(' ', '') == '':
                 continue
-            
+
+            key = parts[3].strip()
+            null = parts[4].strip()
+            category = parts[6].strip()
+
+            # Case-normalized variants computed once here; both chunk
+            # creators read these instead of re-normalizing per table
             columns.append({
                 'name': col_name,
-                'data_type': data_type,
+                'data_type': parts[2].strip(),
                 'key': key,
+                'key_u': key.upper(),
+                'key_l': key.lower(),
                 'null': null,
-                'description': description,
-                'category': category
+                'null_l': null.lower(),
+                'description': parts[5].strip(),
+                'category': category,
+                'category_l': category.lower()
             })
-        
+
         return columns
     
     def _create_database_chunk(self, db_info: Dict[str, Any], tables: List[Dict[str, Any]]) -> DatabaseChunk:
         """Create streamlined database info chunk with table information for better semantic search"""
         # Create content with database info
-        content_lines = [
-            f"Database: {db_info.get('db_name', 'Unknown')}",
-            f"System: {db_info.get('system_name', 'Unknown')}",
-            f"Module: {db_info.get('module_name', 'Unknown')}",
-            f"Purpose: {db_info.get('purpose', 'Unknown')}",
-            ""
-        ]
-
-        # Add key table information
-        if tables:
-            content_lines.append("Key Tables:")
-            for table in tables[:10]:  # Limit to first 10 tables
-                table_name = table.get('table_name', 'Unknown')
-                table_purpose = table.get('purpose', 'Unknown')
-                content_lines.append(f"- {table_name}: {table_purpose}")
+        header = (
+            f"Database: {db_info.get('db_name', 'Unknown')}\n"
+            f"System: {db_info.get('system_name', 'Unknown')}\n"
+            f"Module: {db_info.get('module_name', 'Unknown')}\n"
+            f"Purpose: {db_info.get('purpose', 'Unknown')}\n"
+        )
 
+        # Add key table information (limited to first 10 tables)
+        if tables:
+            table_lines = "\n".join(
+                f"- {table.get('table_name', 'Unknown')}: {table.get('purpose', 'Unknown')}"
+                for table in tables[:10]
+            )
+            content = f"{header}\nKey Tables:\n{table_lines}"
             if len(tables) > 10:
-                content_lines.append(f"- ... and {len(tables) - 10} more tables")
-
-        content = "\n".join(content_lines)
+                content += f"\n- ... and {len(tables) - 10} more tables"
+        else:
+            content = header
         
         # Create minimal metadata for filtering
         metadata = {
@@ -310,12 +354,21 @@ class SQLKnowledgeBaseChunker:
         # Simple content - just table name and purpose
         content = f"Table: {table_name}\nPurpose: {table_purpose}"
 
-        # Extract primary keys and unique keys from table columns
+        # Extract primary keys and unique keys from table columns in one pass
         columns = table.get('columns', [])
-        if primary_keys is None:
-            primary_keys = [c['name'] for c in columns if c.get('key','').upper() == 'PRI']
-        if unique_keys is None:
-            unique_keys = [c['name'] for c in columns if c.get('key','').upper() == 'UNI']
+        if primary_keys is None or unique_keys is None:
+            found_primary = []
+            found_unique = []
+            for c in columns:
+                key = c.get('key_u', '')
+                if key == 'PRI':
+                    found_primary.append(c['name'])
+                elif key == 'UNI':
+                    found_unique.append(c['name'])
+            if primary_keys is None:
+                primary_keys = found_primary
+            if unique_keys is None:
+                unique_keys = found_unique
 
         # Minimal metadata for filtering
         metadata = {
@@ -344,55 +397,47 @@ class SQLKnowledgeBaseChunker:
         table_purpose = table['purpose']
         columns = table['columns']
 
-        # Create content with column details in readable format
-        content_lines = [
-            f"Table: {table_name}",
-            f"Purpose: {table_purpose}",
-            ""
-        ]
-
-        # Add column information in structured, readable format
-        for col in columns:
-            # Format: column_name data_type key null description category
-            key = col.get('key', '').lower().strip()
-            null = col.get('null', '').lower().strip()
-            description = col.get('description', '').strip()
-            category = col.get('category', '').lower().strip()
-
-            # Build the column description line
-            parts = [
-                col['name'],
-                col['data_type']
-            ]
-
-            if key:
-                parts.append(key)
-            if null:
-                parts.append(null)
-            if description:
-                parts.append(description)
-            if category:
-                parts.append(category)
-
-            col_line = " ".join(parts)
-            content_lines.append(col_line)
-
-        content = "\n".join(content_lines)
+        # Create content with column details in readable format; one join
+        # over a generator instead of growing an intermediate list per column.
+        # Line format: column_name data_type key null description category
+        content = f"Table: {table_name}\nPurpose: {table_purpose}\n\n" + "\n".join(
+            " ".join(
+                part for part in (
+                    col['name'],
+                    col['data_type'],
+                    col.get('key_l', ''),
+                    col.get('null_l', ''),
+                    col.get('description', ''),
+                    col.get('category_l', '')
+                )
+                if part
+            )
+            for col in columns
+        )
         
-        # Extract useful metadata for SQL generation
-        # primary_keys = [col['name'] for col in columns if 'PRI' in col.get('key', '')]
-        primary_keys   = [c['name'] for c in columns if c.get('key','').upper() == 'PRI']
-        unique_columns = [c['name'] for c in columns if c.get('key','').upper() == 'UNI']
-        indexed_cols   = [c['name'] for c in columns if c.get('key','').upper() == 'MUL']
+        # Extract useful metadata for SQL generation; classify names and
+        # keys in a single pass over the columns
+        column_names = []
+        primary_keys = []
+        unique_columns = []
+        indexed_cols = []
+        for c in columns:
+            column_names.append(c['name'])
+            key = c.get('key_u', '')
+            if key == 'PRI':
+                primary_keys.append(c['name'])
+            elif key == 'UNI':
+                unique_columns.append(c['name'])
+            elif key == 'MUL':
+                indexed_cols.append(c['name'])
 
-        
         # Metadata focused on what's needed for SQL generation
         metadata = {
             'chunk_type': 'column',
             'database_name': db_name,
             'table_name': table_name,
             'module_name': module_name,
-            'column_names': [col['name'] for col in columns],
+            'column_names': column_names,
             'primary_keys': primary_keys,
             'unique_keys': unique_columns,
             'indexed_columns': indexed_cols
@@ -408,28 +453,66 @@ class SQLKnowledgeBaseChunker:
             metadata=metadata
         )
     
-    def process_directory(self, directory_path: str) -> List[Union['DatabaseChunk', 'TableChunk', 'ColumnChunk']]:
-        """Process all markdown files in a directory (non-recursive)"""
+    def process_directory(self, directory_path: str, workers: Optional[int] = None) -> List[Union['DatabaseChunk', 'TableChunk', 'ColumnChunk']]:
+        """Process all markdown files in a directory (non-recursive).
+
+        Parsing is pure CPU work and independent per file, so with
+        workers > 1 the files are fanned out over a process pool.
+        """
+        # scandir entries carry the joined path and cached stat info, so
+        # this is one syscall per entry instead of listdir + join + stat
+        with os.scandir(directory_path) as it:
+            md_files = sorted(
+                entry.path for entry in it
+                if entry.is_file() and entry.name.lower().endswith('.md')
+            )
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
         all_chunks = []
-        
-        for filename in os.listdir(directory_path):
-            if filename.lower().endswith('.md'):
-                file_path = os.path.join(directory_path, filename)
-                chunks = self.parse_markdown_file(file_path)
-                all_chunks.extend(chunks)
-        
+        if workers > 1 and len(md_files) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(md_files))) as executor:
+                for chunks, errors in executor.map(_parse_file_worker, md_files, chunksize=4):
+                    all_chunks.extend(chunks)
+                    self.parsing_errors.extend(errors)
+        else:
+            for file_path in md_files:
+                all_chunks.extend(self.parse_markdown_file(file_path))
+
         return all_chunks
     
     def save_chunks_to_json(self, chunks: List[Union['DatabaseChunk', 'TableChunk', 'ColumnChunk']], output_path: str):
         """Save chunks to JSON file for inspection"""
         chunk_dicts = [chunk.to_dict() for chunk in chunks]
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(chunk_dicts, f, indent=2, ensure_ascii=False)
-        
+
+        # orjson serializes UTF-8 bytes directly, skipping the stdlib
+        # pure-Python pretty-printer on the batch output path
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(chunk_dicts, option=orjson.OPT_INDENT_2))
+
         logger.info(f"Saved {len(chunks)} chunks to {output_path}")
 
 
+# Per-process chunker reused across files handed to the same pool worker
+_WORKER_CHUNKER = None
+
+
+def _parse_file_worker(file_path: str) -> Tuple[List[Union['DatabaseChunk', 'TableChunk', 'ColumnChunk']], List[str]]:
+    """Parse one markdown file; returns (chunks, parsing errors).
+
+    Module-level so ProcessPoolExecutor can pickle it; errors are returned
+    rather than accumulated so the parent process can collect them.
+    """
+    global _WORKER_CHUNKER
+    if _WORKER_CHUNKER is None:
+        _WORKER_CHUNKER = SQLKnowledgeBaseChunker()
+    chunker = _WORKER_CHUNKER
+    chunker.parsing_errors = []
+    chunks = chunker.parse_markdown_file(file_path)
+    return chunks, chunker.parsing_errors
+
+
 def print_all_chunks(chunks: List[Union['DatabaseChunk', 'TableChunk', 'ColumnChunk']]):
     """Print all chunks in a detailed, readable format"""
     print("\n" + "="*80)
@@ -492,6 +575,10 @@ def main():
         "--quiet", action="store_true",
         help="Do not print detailed chunks to stdout (useful when processing many files)"
     )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(),
+        help="Number of parser processes for directory mode (default: CPU count)"
+    )
     args = parser.parse_args()
 
     input_path = args.input_path
@@ -510,11 +597,11 @@ def main():
 
     # If directory: process all .md files (non-recursive)
     if os.path.isdir(input_path):
-        md_files = sorted(
-            os.path.join(input_path, f)
-            for f in os.listdir(input_path)
-            if f.lower().endswith(".md")
-        )
+        with os.scandir(input_path) as it:
+            md_files = sorted(
+                entry.path for entry in it
+                if entry.is_file() and entry.name.lower().endswith(".md")
+            )
 
         if not md_files:
             print(f"No .md files found in folder: {input_path}")
@@ -522,28 +609,42 @@ def main():
 
         total_chunks = 0
         processed_files = 0
+        workers = max(1, args.workers or 1)
 
         print(f"\nProcessing {len(md_files)} markdown files from: {input_path}")
         print("-" * 60)
 
-        for fp in md_files:
-            print(f"\nProcessing file: {fp}")
-            print("-" * 60)
-            chunks = chunker.parse_markdown_file(fp)
+        # Parsing is CPU-bound and per-file independent; fan it out over a
+        # process pool and keep the JSON writes in the main process
+        if workers > 1 and len(md_files) > 1:
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(md_files)))
+            results = pool.map(_parse_file_worker, md_files, chunksize=4)
+        else:
+            pool = None
+            results = map(_parse_file_worker, md_files)
 
-            if not chunks:
-                print(f"No chunks were created from {fp}")
-                continue
+        try:
+            for fp, (chunks, errors) in zip(md_files, results):
+                print(f"\nProcessing file: {fp}")
+                print("-" * 60)
+                chunker.parsing_errors.extend(errors)
+
+                if not chunks:
+                    print(f"No chunks were created from {fp}")
+                    continue
 
-            if not quiet:
-                print_all_chunks(chunks)
+                if not quiet:
+                    print_all_chunks(chunks)
 
-            base_name = os.path.splitext(os.path.basename(fp))[0]
-            out_file = os.path.join(output_dir, f"{base_name}_chunks.json")
-            chunker.save_chunks_to_json(chunks, out_file)
+                base_name = os.path.splitext(os.path.basename(fp))[0]
+                out_file = os.path.join(output_dir, f"{base_name}_chunks.json")
+                chunker.save_chunks_to_json(chunks, out_file)
 
-            processed_files += 1
-            total_chunks += len(chunks)
+                processed_files += 1
+                total_chunks += len(chunks)
+        finally:
+            if pool is not None:
+                pool.shutdown()
 
         # Summary for directory processing
         print(f"\n{'='*35} SUMMARY {'='*35}")
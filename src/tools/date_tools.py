@@ -11,6 +11,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Bound once at import; the tool can be called in tight agent loops, so
+# per-call attribute lookups and tz normalization are worth skipping
+_UTC = timezone.utc
+_NOW = datetime.now
+_UTC_NAMES = frozenset({"UTC", "utc", "Utc"})
+
 
 @tool
 def get_current_date(format: Optional[str] = None, tz: Optional[str] = "UTC") -> str:
@@ -24,18 +30,15 @@ def get_current_date(format: Optional[str] = None, tz: Optional[str] = "UTC") ->
     Returns:
         Current date and time as a formatted string.
     """
-    try:
-        if tz.upper() == "UTC":
-            now = datetime.now(timezone.utc)
-        else:
-            logger.warning(f"Timezone {tz} not implemented, using UTC")
-            now = datetime.now(timezone.utc)
+    if tz not in _UTC_NAMES:
+        logger.warning(f"Timezone {tz} not implemented, using UTC")
 
-        if format:
-            return now.strftime(format)
-        else:
-            return now.isoformat()
+    now = _NOW(_UTC)
+    if not format:
+        return now.isoformat()
 
+    try:
+        return now.strftime(format)
     except Exception as e:
         logger.error(f"Error getting current date: {e}")
         return f"Error: {str(e)}"
\ No newline at end of file